@@ -9,31 +9,1157 @@ def create_save_selection_tool_button():
 # Made By Nnamdi Echiemunor (munorr.3d)
 
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
 from maya import OpenMayaUI as omui
 
 try:
     from PySide6 import QtWidgets, QtCore, QtGui
     from PySide6.QtCore import QTimer, QPropertyAnimation, QEasingCurve
     from PySide6.QtGui import QColor
-    from shiboken6 import wrapInstance
+    from shiboken6 import wrapInstance, isValid
 except ImportError:
     from PySide2 import QtWidgets, QtCore, QtGui
     from PySide2.QtCore import QTimer, QPropertyAnimation, QEasingCurve
     from PySide2.QtGui import QColor
-    from shiboken2 import wrapInstance
+    from shiboken2 import wrapInstance, isValid
 
+import base64
+import bisect
+import fnmatch
+import heapq
 import json
+import os
+import re
+import time
+from array import array
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_maya_main_window = None
 
 def maya_main_window():
-    main_window_ptr = omui.MQtUtil.mainWindow()
-    return wrapInstance(int(main_window_ptr), QtWidgets.QWidget)
+    # The wrapper is reused for as long as the underlying Qt window is alive
+    global _maya_main_window
+    if _maya_main_window is None or not isValid(_maya_main_window):
+        main_window_ptr = omui.MQtUtil.mainWindow()
+        _maya_main_window = wrapInstance(int(main_window_ptr), QtWidgets.QWidget)
+    return _maya_main_window
+
+def activate_maya_window():
+    # Hand keyboard focus back to Maya, skipping the call when it already has it
+    main_window = maya_main_window()
+    if not main_window.isActiveWindow():
+        main_window.activateWindow()
+
+# Process-wide caches shared by every button: text widths per (font, text), derived hover and
+# pressed colors, and the style rules generated per button color. invalidate_style_cache clears
+# them when the application font or the screen DPI changes.
+_text_widths = {}
+_derived_colors = {}
+_color_style_rules = {}
+
+def invalidate_style_cache():
+    _text_widths.clear()
+    _derived_colors.clear()
+    _color_style_rules.clear()
+
+def text_width(text, font=None):
+    font = font or QtWidgets.QApplication.font()
+    key = (font.key(), text)
+    width = _text_widths.get(key)
+    if width is None:
+        width = _text_widths[key] = QtGui.QFontMetrics(font).horizontalAdvance(text)
+    return width
 
 def hex_value(hex_color, factor):
-    color = QColor(hex_color)
-    h, s, v, a = color.getHsvF()
-    v = min(max(v * factor, 0), 1) 
-    color.setHsvF(h, s, v, a)
-    return color.name()
+    key = ('hsv', hex_color, factor)
+    if key not in _derived_colors:
+        color = QColor(hex_color)
+        h, s, v, a = color.getHsvF()
+        v = min(max(v * factor, 0), 1) 
+        color.setHsvF(h, s, v, a)
+        _derived_colors[key] = color.name()
+    return _derived_colors[key]
+
+def lighten_color(color, factor=1.2):
+    key = ('hsl', color, factor)
+    if key not in _derived_colors:
+        c = QColor(color)
+        h, s, l, a = c.getHsl()
+        l = min(int(l * factor), 255)
+        c.setHsl(h, s, l, a)
+        _derived_colors[key] = c.name()
+    return _derived_colors[key]
+
+def color_style_rule(color):
+    if color not in _color_style_rules:
+        _color_style_rules[color] = f'''
+            QPushButton#selectionButton[buttonColor="{color}"] {{background-color: {color};}}
+            QPushButton#selectionButton[buttonColor="{color}"]:hover {{background-color: {lighten_color(color)};}}
+        '''
+    return _color_style_rules[color]
+
+def selection_operation(modifiers):
+    # Shift adds, Ctrl subtracts and Ctrl+Shift intersects with the current selection
+    shift = bool(modifiers & QtCore.Qt.ShiftModifier)
+    control = bool(modifiers & QtCore.Qt.ControlModifier)
+    if shift and control:
+        return 'intersect'
+    if control:
+        return 'subtract'
+    if shift:
+        return 'union'
+    return 'replace'
+
+def combine_selection(operation, current, members):
+    # Set algebra on member paths, keeping the order in which paths were first selected
+    if operation == 'replace':
+        return list(dict.fromkeys(members))
+    if operation == 'union':
+        return list(dict.fromkeys(list(current) + list(members)))
+    members = set(members)
+    if operation == 'subtract':
+        return [path for path in current if path not in members]
+    return [path for path in current if path in members]
+
+def has_components(paths):
+    return any('.' in path for path in paths)
+
+def node_of(path):
+    # Components belong to the node before the first dot
+    return path.split('.', 1)[0]
+
+def encode_ranges(indices):
+    # Sorted component indices as merged runs: [start, end, start, end, ...]
+    if numpy is not None:
+        indices = numpy.unique(numpy.asarray(indices, dtype=numpy.int64))
+        if not len(indices):
+            return []
+        breaks = numpy.flatnonzero(numpy.diff(indices) != 1)
+        starts = numpy.concatenate((indices[:1], indices[breaks + 1]))
+        ends = numpy.concatenate((indices[breaks], indices[-1:]))
+        return numpy.column_stack((starts, ends)).ravel().tolist()
+    ranges = []
+    for index in sorted(set(indices)):
+        if ranges and index == ranges[-1] + 1:
+            ranges[-1] = index
+        else:
+            ranges.extend((index, index))
+    return ranges
+
+def decode_ranges(ranges):
+    if numpy is not None:
+        starts = numpy.asarray(ranges[0::2], dtype=numpy.int64)
+        lengths = numpy.asarray(ranges[1::2], dtype=numpy.int64) - starts + 1
+        # One arange over every run, shifted by each run's offset from its position in the output
+        run_offsets = starts - (numpy.cumsum(lengths) - lengths)
+        return numpy.arange(lengths.sum(), dtype=numpy.int64) + numpy.repeat(run_offsets, lengths)
+    return [index for start, end in zip(ranges[0::2], ranges[1::2]) for index in range(start, end + 1)]
+
+def combine_ranges(operation, current, members):
+    # Union, difference or intersection computed on the runs themselves, never on single indices.
+    # Between two consecutive run boundaries each operand either covers every index or none.
+    if operation == 'replace':
+        return list(members)
+    keep_segment = {
+        'union': lambda in_current, in_members: in_current | in_members,
+        'subtract': lambda in_current, in_members: in_current & (in_current ^ in_members),  # a and not b, for bools and bool arrays
+        'intersect': lambda in_current, in_members: in_current & in_members,
+    }[operation]
+    if numpy is not None:
+        current = numpy.asarray(current, dtype=numpy.int64).reshape(-1, 2)
+        members = numpy.asarray(members, dtype=numpy.int64).reshape(-1, 2)
+        bounds = numpy.unique(numpy.concatenate((current[:, 0], current[:, 1] + 1, members[:, 0], members[:, 1] + 1)))
+        in_current = numpy.searchsorted(current[:, 0], bounds, 'right') > numpy.searchsorted(current[:, 1] + 1, bounds, 'right')
+        in_members = numpy.searchsorted(members[:, 0], bounds, 'right') > numpy.searchsorted(members[:, 1] + 1, bounds, 'right')
+        keep = keep_segment(in_current, in_members).astype(numpy.int8)
+        change = numpy.diff(numpy.concatenate(([0], keep, [0])))
+        starts = bounds[numpy.flatnonzero(change == 1)]
+        ends = bounds[numpy.flatnonzero(change == -1)] - 1
+        return numpy.column_stack((starts, ends)).ravel().tolist()
+    current_starts, current_ends = current[0::2], [end + 1 for end in current[1::2]]
+    member_starts, member_ends = members[0::2], [end + 1 for end in members[1::2]]
+    bounds = sorted(set(current_starts + current_ends + member_starts + member_ends))
+    ranges = []
+    for index, bound in enumerate(bounds[:-1]):
+        in_current = bisect.bisect_right(current_starts, bound) > bisect.bisect_right(current_ends, bound)
+        in_members = bisect.bisect_right(member_starts, bound) > bisect.bisect_right(member_ends, bound)
+        if keep_segment(in_current, in_members):
+            if ranges and ranges[-1] == bound - 1:
+                ranges[-1] = bounds[index + 1] - 1
+            else:
+                ranges.extend((bound, bounds[index + 1] - 1))
+    return ranges
+
+component_types = {
+    'vtx': om.MFn.kMeshVertComponent,
+    'e': om.MFn.kMeshEdgeComponent,
+    'f': om.MFn.kMeshPolygonComponent,
+    'map': om.MFn.kMeshMapComponent,
+    'cv': om.MFn.kCurveCVComponent,
+}
+
+def capture_selection(selection_list):
+    # Splits a selection into member paths and single indexed components, which are kept as
+    # {(shape path, component type): ranges}. Other components stay as paths.
+    component_names = {api_type: name for name, api_type in component_types.items()}
+    paths = []
+    component_strings = []
+    indices = {}
+    for index in range(selection_list.length()):
+        try:
+            dag_path, component = selection_list.getComponent(index)
+        except (TypeError, RuntimeError):
+            paths.append(om.MFnDependencyNode(selection_list.getDependNode(index)).name())
+            continue
+        if component.isNull():
+            paths.append(dag_path.fullPathName())
+        elif component.apiType() in component_names:
+            key = (dag_path.fullPathName(), component_names[component.apiType()])
+            indices.setdefault(key, []).extend(om.MFnSingleIndexedComponent(component).getElements())
+        else:
+            component_strings.extend(selection_list.getSelectionStrings(index))
+    if component_strings:
+        paths.extend(cmds.ls(component_strings, long=True))
+    return paths, {key: encode_ranges(values) for key, values in indices.items()}
+
+def combine_components(operation, current, members):
+    if operation == 'replace':
+        return dict(members)
+    combined = {} if operation == 'intersect' else dict(current)
+    for key, ranges in members.items():
+        if operation == 'union':
+            combined[key] = combine_ranges('union', current.get(key, []), ranges)
+        elif key in current:
+            combined[key] = combine_ranges(operation, current[key], ranges)
+    return {key: ranges for key, ranges in combined.items() if ranges}
+
+def add_components(selection_list, components):
+    for (node, component_type), ranges in components.items():
+        node_list = om.MSelectionList()
+        try:
+            node_list.add(node)
+            dag_path = node_list.getDagPath(0)
+        except (RuntimeError, TypeError):
+            continue
+        component_fn = om.MFnSingleIndexedComponent()
+        component = component_fn.create(component_types[component_type])
+        indices = decode_ranges(ranges)
+        component_fn.addElements(indices.tolist() if numpy is not None else indices)
+        selection_list.add((dag_path, component))
+    return selection_list
+
+def component_paths(components):
+    return [f"{node}.{component_type}[{start}:{end}]"
+            for (node, component_type), ranges in components.items()
+            for start, end in zip(ranges[0::2], ranges[1::2])]
+
+def pack_array(typecode, values):
+    return base64.b64encode(array(typecode, values).tobytes()).decode('ascii')
+
+def unpack_array(typecode, text):
+    values = array(typecode)
+    values.frombytes(base64.b64decode(text))
+    return values
+
+def capture_weights(rich_selection):
+    # Weighted single indexed components of a soft or rich selection, as
+    # [[shape path, component type, packed indices, packed weights], ...]
+    component_names = {api_type: name for name, api_type in component_types.items()}
+    selection_list = rich_selection.getSelection()
+    weights = []
+    for index in range(selection_list.length()):
+        try:
+            dag_path, component = selection_list.getComponent(index)
+        except (TypeError, RuntimeError):
+            continue
+        if component.isNull() or component.apiType() not in component_names:
+            continue
+        component_fn = om.MFnSingleIndexedComponent(component)
+        elements = component_fn.getElements()
+        if component_fn.hasWeights:
+            influences = [component_fn.weight(element).influence for element in range(len(elements))]
+        else:
+            influences = [1.0] * len(elements)
+        weights.append([dag_path.fullPathName(), component_names[component.apiType()],
+                        pack_array('i', elements), pack_array('f', influences)])
+    return weights
+
+def weighted_selection(weights):
+    # Rebuilds a rich selection from capture_weights entries, applied with one setRichSelection call
+    selection_list = om.MSelectionList()
+    for node, component_type, packed_elements, packed_weights in weights:
+        node_list = om.MSelectionList()
+        try:
+            node_list.add(node)
+            dag_path = node_list.getDagPath(0)
+        except (RuntimeError, TypeError):
+            continue
+        component_fn = om.MFnSingleIndexedComponent()
+        component = component_fn.create(component_types[component_type])
+        component_fn.addElements(list(unpack_array('i', packed_elements)))
+        for element, influence in enumerate(unpack_array('f', packed_weights)):
+            component_fn.setWeight(element, om.MWeight(influence))
+        selection_list.add((dag_path, component))
+    rich_selection = om.MRichSelection()
+    rich_selection.setSelection(selection_list)
+    return rich_selection
+
+def add_paths(selection_list, paths):
+    for path in paths:
+        try:
+            selection_list.add(path)
+        except RuntimeError:
+            pass
+    return selection_list
+
+def suffixed_name(name, counter):
+    return f"{name}_{counter}" if counter == 1 else f"{name}_{counter:02d}"
+
+def object_set_name(selection_name):
+    return 'selectSet_' + re.sub('[^0-9A-Za-z_]', '_', selection_name)
+
+def flatten_paths(paths):
+    # cmds.ls lists the whole scene when given an empty list
+    return cmds.ls(paths, long=True, flatten=True) if paths else []
+
+class SelectionDataStore(object):
+    # In-memory model of the tool's data on defaultObjectSet. The attributes are parsed once
+    # and only re-read after a scene change or an edit made outside the tool (undo, script,
+    # referenced edits). Saves mark the touched tabs dirty and are written once the UI is
+    # idle, before the scene is saved, or when the tool closes.
+    #
+    # Each tab is stored in its own string attribute (selectToolTab<N>) and selectToolIndex
+    # holds the tab order as [tab name, attribute] pairs, so an edit only rewrites the shard
+    # of the tab it touched. Scenes saved with the single selectToolData blob are still read
+    # and are migrated to shards on the first edit.
+    node_name = 'defaultObjectSet'
+    index_attr = 'selectToolIndex'
+    shard_prefix = 'selectToolTab'
+    legacy_attr = 'selectToolData'
+    flush_delay = 250  # ms of inactivity before pending edits are written
+
+    def __init__(self, on_external_change=None):
+        self.on_external_change = on_external_change
+        self.data = None
+        self.shards = {}  # tab name -> shard attribute
+        self.written_order = []
+        self.legacy_data = False
+        self.writing = False
+        self.dirty_tabs = set()
+        self.dirty = False
+        self.save_requests = 0
+        self.write_count = 0
+        self.version = 0  # bumped whenever the in-memory data changes or is dropped
+        self.flush_timer = QTimer()
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush)
+        self.scene_callback_ids = []
+        self.node_callback_ids = []
+        for message in (om.MSceneMessage.kBeforeSave, om.MSceneMessage.kBeforeOpen, om.MSceneMessage.kBeforeNew):
+            self.scene_callback_ids.append(om.MSceneMessage.addCallback(message, self.flush))
+        for message in (om.MSceneMessage.kAfterOpen, om.MSceneMessage.kAfterNew, om.MSceneMessage.kAfterImport):
+            self.scene_callback_ids.append(om.MSceneMessage.addCallback(message, self.on_scene_changed))
+
+    def get(self):
+        if self.data is None:
+            self.data = self.read()
+            self.watch_node()
+        return self.data
+
+    def save(self, selection_dict, tabs=None):
+        # tabs lists the tabs whose content changed; None marks every tab dirty
+        self.data = selection_dict
+        self.version += 1
+        self.dirty_tabs.update(selection_dict if tabs is None else tabs)
+        self.save_requests += 1
+        self.dirty = True
+        self.flush_timer.start(self.flush_delay)
+
+    def flush(self, *args):
+        self.flush_timer.stop()
+        if not self.dirty or self.data is None:
+            return
+        # Persisting the tool's data is not a scene edit the animator should have to undo
+        undo_state = cmds.undoInfo(query=True, stateWithoutFlush=True)
+        cmds.undoInfo(stateWithoutFlush=False)
+        self.writing = True
+        try:
+            self.write_shards()
+        finally:
+            self.writing = False
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+        cmds.file(modified=True)
+        self.dirty_tabs.clear()
+        self.dirty = False
+        self.write_count += 1
+
+    def write_shards(self):
+        for tab_name in [name for name in self.shards if name not in self.data]:
+            cmds.deleteAttr(self.node_name, attribute=self.shards.pop(tab_name))
+
+        for tab_name, tab_data in self.data.items():
+            if tab_name not in self.shards:
+                self.shards[tab_name] = self.add_shard_attr()
+            elif tab_name not in self.dirty_tabs:
+                continue
+            self.set_string(self.shards[tab_name], json.dumps(tab_data))
+
+        order = list(self.data)
+        if order != self.written_order:
+            self.set_string(self.index_attr, json.dumps([[name, self.shards[name]] for name in order]))
+            self.written_order = order
+
+        if self.legacy_data:
+            self.set_string(self.legacy_attr, "")
+            self.legacy_data = False
+
+    def add_shard_attr(self):
+        used = set(self.shards.values())
+        number = len(used)
+        while f'{self.shard_prefix}{number}' in used or cmds.attributeQuery(f'{self.shard_prefix}{number}', node=self.node_name, exists=True):
+            number += 1
+        attr = f'{self.shard_prefix}{number}'
+        cmds.addAttr(self.node_name, longName=attr, dataType='string')
+        return attr
+
+    def set_string(self, attr, value):
+        if not cmds.attributeQuery(attr, node=self.node_name, exists=True):
+            cmds.addAttr(self.node_name, longName=attr, dataType='string')
+        cmds.setAttr(f'{self.node_name}.{attr}', value, type='string')
+
+    def merged_writes(self):
+        return self.save_requests - self.write_count - (1 if self.dirty else 0)
+
+    def report(self):
+        print(f"Save Selection Tool: {self.save_requests} edits saved in {self.write_count} writes ({self.merged_writes()} merged)")
+
+    def read(self):
+        self.shards = {}
+        self.written_order = []
+        self.legacy_data = False
+        if not cmds.objExists(self.node_name):
+            cmds.createNode('objectSet', name=self.node_name)
+
+        index = self.read_json(self.index_attr)
+        if index:
+            selection_dict = {}
+            for tab_name, attr in index:
+                selection_dict[tab_name] = self.read_json(attr) or {}
+                self.shards[tab_name] = attr
+            self.written_order = list(selection_dict)
+            return selection_dict
+
+        legacy = self.read_json(self.legacy_attr)
+        if legacy:
+            self.legacy_data = True
+            return legacy
+        return {"1": {}}  # Initialize with a default tab
+
+    def read_json(self, attr):
+        if not cmds.attributeQuery(attr, node=self.node_name, exists=True):
+            return None
+        data = cmds.getAttr(f'{self.node_name}.{attr}')
+        if data:
+            try:
+                return json.loads(data)
+            except json.JSONDecodeError:
+                cmds.warning(f"Invalid data in {attr}. Resetting.")
+        return None
+
+    def is_store_attr(self, attr):
+        return attr in (self.index_attr, self.legacy_attr) or attr.startswith(self.shard_prefix)
+
+    def invalidate(self):
+        self.version += 1
+        self.flush_timer.stop()
+        self.dirty_tabs.clear()
+        self.dirty = False
+        self.data = None
+
+    def watch_node(self):
+        self.remove_node_callbacks()
+        selection_list = om.MSelectionList()
+        try:
+            selection_list.add(self.node_name)
+        except RuntimeError:
+            return
+        node = selection_list.getDependNode(0)
+        self.node_callback_ids.append(om.MNodeMessage.addAttributeChangedCallback(node, self.on_attribute_changed))
+
+    def on_attribute_changed(self, msg, plug, other_plug, client_data):
+        if self.writing or not msg & om.MNodeMessage.kAttributeSet:
+            return
+        if self.is_store_attr(plug.partialName(useLongNames=True)):
+            self.changed_externally()
+
+    def on_scene_changed(self, *args):
+        self.remove_node_callbacks()
+        self.changed_externally()
+
+    def changed_externally(self):
+        self.invalidate()
+        if self.on_external_change:
+            self.on_external_change()
+
+    def remove_node_callbacks(self):
+        if self.node_callback_ids:
+            om.MMessage.removeCallbacks(self.node_callback_ids)
+            self.node_callback_ids = []
+
+    def remove_callbacks(self):
+        self.flush_timer.stop()
+        self.remove_node_callbacks()
+        if self.scene_callback_ids:
+            om.MMessage.removeCallbacks(self.scene_callback_ids)
+            self.scene_callback_ids = []
+
+class SceneGeneration(object):
+    # Counts DAG changes (DAG nodes added, removed, renamed or reparented), so results derived
+    # from scene paths can be cached against the generation they were computed at instead of
+    # being recomputed per use. DG-only nodes such as animCurves and utility nodes are ignored.
+    def __init__(self, on_change=None):
+        self.value = 0
+        self.on_change = on_change
+        self.callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(self.bump, "dagNode"),
+            om.MDGMessage.addNodeRemovedCallback(self.bump, "dagNode"),
+            om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, self.on_name_changed),
+            om.MDagMessage.addAllDagChangesCallback(self.bump),
+        ]
+        for message in (om.MSceneMessage.kAfterOpen, om.MSceneMessage.kAfterNew):
+            self.callback_ids.append(om.MSceneMessage.addCallback(message, self.bump))
+
+    def on_name_changed(self, node, *args):
+        if node.hasFn(om.MFn.kDagNode):
+            self.bump()
+
+    def bump(self, *args):
+        self.value += 1
+        if self.on_change:
+            self.on_change()
+
+    def remove_callbacks(self):
+        if self.callback_ids:
+            om.MMessage.removeCallbacks(self.callback_ids)
+            self.callback_ids = []
+
+class NodePathResolver(object):
+    # Turns stored node UUIDs into current paths, so sets follow renamed and reparented nodes.
+    # Lookups are cached until the scene generation changes; resolving a set is then one
+    # dictionary lookup per member. The generation only counts DAG changes, so the entry of a
+    # DG node is also dropped when that node is added, removed or renamed.
+    def __init__(self, scene_generation):
+        self.scene_generation = scene_generation
+        self.paths = {}  # uuid -> current path, or None when no node has it
+        self.generation = None
+        self.callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(self.forget_node, "dependNode"),
+            om.MDGMessage.addNodeRemovedCallback(self.forget_node, "dependNode"),
+            om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, self.forget_node),
+        ]
+
+    def forget_node(self, node, *args):
+        if self.paths:
+            self.paths.pop(om.MFnDependencyNode(node).uuid().asString(), None)
+
+    def remove_callbacks(self):
+        if self.callback_ids:
+            om.MMessage.removeCallbacks(self.callback_ids)
+            self.callback_ids = []
+
+    def path_of(self, uuid):
+        if self.generation != self.scene_generation.value:
+            self.paths.clear()
+            self.generation = self.scene_generation.value
+        if uuid not in self.paths:
+            self.paths[uuid] = self.lookup(uuid)
+        return self.paths[uuid]
+
+    def lookup(self, uuid):
+        selection_list = om.MSelectionList()
+        try:
+            selection_list.add(om.MUuid(uuid))
+        except (RuntimeError, ValueError, TypeError):
+            return None
+        if selection_list.isEmpty():
+            return None
+        try:
+            return selection_list.getDagPath(0).fullPathName()
+        except TypeError:
+            return om.MFnDependencyNode(selection_list.getDependNode(0)).name()
+
+    def resolve(self, objects, uuids):
+        # Current paths of the stored members; members whose node is not found keep their last known path
+        if not uuids or len(uuids) != len(objects):
+            return list(objects)
+        resolved = []
+        for path, uuid in zip(objects, uuids):
+            node_path = self.path_of(uuid) if uuid else None
+            resolved.append(node_path + path[len(node_of(path)):] if node_path else path)
+        return resolved
+
+    def uuids_of(self, paths):
+        # One UUID per path, components sharing their node's; None where the node does not exist
+        uuids = {}
+        for node in {node_of(path) for path in paths}:
+            selection_list = om.MSelectionList()
+            try:
+                selection_list.add(node)
+            except RuntimeError:
+                continue
+            uuids[node] = om.MFnDependencyNode(selection_list.getDependNode(0)).uuid().asString()
+        return [uuids.get(node_of(path)) for path in paths]
+
+class RuleSetEvaluator(object):
+    # Expands rule sets, which store how to find their members instead of the members. Results
+    # are cached per rule until the scene generation changes, so repeat clicks are a lookup.
+    def __init__(self, scene_generation, resolver):
+        self.scene_generation = scene_generation
+        self.resolver = resolver
+        self.results = {}  # rule as sorted JSON -> member paths
+        self.generation = None
+
+    def evaluate(self, rule):
+        if self.generation != self.scene_generation.value:
+            self.results.clear()
+            self.generation = self.scene_generation.value
+        key = json.dumps(rule, sort_keys=True)
+        if key not in self.results:
+            if rule.get('type') == 'hierarchy':
+                self.results[key] = self.expand_hierarchy(rule)
+            elif rule.get('type') == 'query':
+                self.results[key] = self.evaluate_query(rule)
+            else:
+                self.results[key] = []
+        return self.results[key]
+
+    def expand_hierarchy(self, rule):
+        # Roots follow renames through their UUIDs; descendants come from one listRelatives call
+        roots = self.resolver.resolve(rule['roots'], rule.get('root_uuids'))
+        roots = cmds.ls(roots, long=True) if roots else []
+        if not roots:
+            return []
+        type_filter = {'type': rule['node_type']} if rule.get('node_type') else {}
+        members = cmds.ls(roots, long=True, **type_filter) if type_filter else list(roots)
+        if rule.get('descendants'):
+            descendants = cmds.listRelatives(roots, allDescendents=True, fullPath=True, **type_filter) or []
+            # listRelatives lists the deepest nodes first
+            members.extend(reversed(descendants))
+        if rule.get('pattern'):
+            members = [path for path in members if fnmatch.fnmatchcase(path.rsplit('|', 1)[-1], rule['pattern'])]
+        return list(dict.fromkeys(members))
+
+    def evaluate_query(self, rule):
+        # One listing of the matching nodes. Wildcards are always matched by Maya, where * stays
+        # within a namespace; regular expressions filter the short names of a type listing. With a
+        # shape type, only matches that are the parent of such a shape are kept.
+        pattern = rule.get('pattern') or '*'
+        type_filter = {'type': rule['node_type']} if rule.get('node_type') else {}
+        if rule.get('match') == 'regex':
+            try:
+                expression = re.compile(pattern)
+            except re.error as error:
+                cmds.warning(f"Invalid regular expression '{pattern}': {error}")
+                return []
+            nodes = [node for node in cmds.ls(long=True, **type_filter) if expression.search(node.rsplit('|', 1)[-1])]
+        else:
+            nodes = cmds.ls(pattern, long=True, **type_filter)
+        if rule.get('shape_type'):
+            shapes = cmds.ls(type=rule['shape_type'], long=True, noIntermediate=True)
+            parents = {shape.rsplit('|', 1)[0] for shape in shapes}
+            nodes = [node for node in nodes if node in parents]
+        return nodes
+
+class SelectionSearchIndex(object):
+    # Set and tab names for the search field, kept up to date as sets are saved, renamed, moved
+    # and deleted. Prefix lookups bisect a sorted name list; fuzzy lookups only test names that
+    # contain every character of the query in order, and a query extending the previous one
+    # narrows the previous matches instead of starting over.
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.sorted_entries = []  # (lower name, kind, tab name, name)
+        self.char_index = {}  # character -> entries whose name contains it
+        self.last_query = None
+        self.last_matches = None
+
+    def rebuild(self, tabs):
+        self.clear()
+        for tab_name, names in tabs.items():
+            self.index_entry(('tab', tab_name, tab_name))
+            for name in names:
+                self.index_entry(('set', tab_name, name))
+        self.sorted_entries.sort()
+
+    def index_entry(self, entry):
+        lower_name = entry[2].lower()
+        self.sorted_entries.append((lower_name,) + entry)
+        for char in set(lower_name):
+            self.char_index.setdefault(char, set()).add(entry)
+
+    def add(self, kind, tab_name, name):
+        entry = (kind, tab_name, name)
+        bisect.insort(self.sorted_entries, (name.lower(),) + entry)
+        for char in set(name.lower()):
+            self.char_index.setdefault(char, set()).add(entry)
+        self.last_query = None
+
+    def remove(self, kind, tab_name, name):
+        entry = (kind, tab_name, name)
+        key = (name.lower(),) + entry
+        index = bisect.bisect_left(self.sorted_entries, key)
+        if index < len(self.sorted_entries) and self.sorted_entries[index] == key:
+            del self.sorted_entries[index]
+        for char in set(name.lower()):
+            self.char_index.get(char, set()).discard(entry)
+        self.last_query = None
+
+    def add_tab(self, tab_name, names=()):
+        self.add('tab', tab_name, tab_name)
+        for name in names:
+            self.add('set', tab_name, name)
+
+    def remove_tab(self, tab_name, names=()):
+        self.remove('tab', tab_name, tab_name)
+        for name in names:
+            self.remove('set', tab_name, name)
+
+    def rename_tab(self, old_name, new_name, names=()):
+        self.remove_tab(old_name, names)
+        self.add_tab(new_name, names)
+
+    def rename_set(self, tab_name, old_name, new_name):
+        self.remove('set', tab_name, old_name)
+        self.add('set', tab_name, new_name)
+
+    def move_set(self, name, old_tab, new_tab):
+        self.remove('set', old_tab, name)
+        self.add('set', new_tab, name)
+
+    def search(self, query, limit=20):
+        # Returns up to limit (kind, tab name, name) entries, best match first
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        # Names starting with the query rank first; when there are enough of them the bisect is all it takes
+        prefix_matches = self.prefix_search(query, limit)
+        if len(prefix_matches) == limit:
+            self.last_query = None
+            return prefix_matches
+
+        if self.last_query is not None and query.startswith(self.last_query):
+            candidates = self.last_matches
+        else:
+            char_sets = sorted((self.char_index.get(char, set()) for char in set(query)), key=len)
+            candidates = char_sets[0].intersection(*char_sets[1:])
+        pattern = re.compile('.*?'.join(re.escape(char) for char in query))
+        matches = {entry for entry in candidates if pattern.search(entry[2].lower())}
+        self.last_query = query
+        self.last_matches = matches
+        return heapq.nsmallest(limit, matches, key=lambda entry: self.rank(query, entry))
+
+    def rank(self, query, entry):
+        lower_name = entry[2].lower()
+        position = lower_name.find(query)
+        if position == 0:
+            score = 0
+        elif position > 0 and not lower_name[position - 1].isalnum():
+            score = 1
+        elif position > 0:
+            score = 2
+        else:
+            score = 3
+        return (score, entry[0] != 'set', len(lower_name), lower_name)
+
+    def prefix_search(self, prefix, limit=20):
+        prefix = prefix.lower()
+        index = bisect.bisect_left(self.sorted_entries, (prefix,))
+        results = []
+        while index < len(self.sorted_entries) and len(results) < limit and self.sorted_entries[index][0].startswith(prefix):
+            results.append(self.sorted_entries[index][1:])
+            index += 1
+        return results
+
+class SelectionMembershipIndex(object):
+    # Reverse index from scene node to the sets storing it, so the sets containing the current
+    # selection are found with one lookup per selected node. Components are indexed under the
+    # node they belong to. Updated per set as sets are saved, renamed, moved and deleted.
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.sets_by_node = {}  # node path -> {(tab name, set name)}
+        self.nodes_by_set = {}  # (tab name, set name) -> node paths
+
+    def rebuild(self, selection_dict, members_of):
+        self.clear()
+        for tab_name, selections in selection_dict.items():
+            for name, data in selections.items():
+                self.set_members(tab_name, name, members_of(data))
+
+    def set_members(self, tab_name, name, objects):
+        key = (tab_name, name)
+        self.remove_set(tab_name, name)
+        nodes = {node_of(path) for path in objects} if isinstance(objects, list) else set()
+        self.nodes_by_set[key] = nodes
+        for node in nodes:
+            self.sets_by_node.setdefault(node, set()).add(key)
+
+    def remove_set(self, tab_name, name):
+        key = (tab_name, name)
+        for node in self.nodes_by_set.pop(key, ()):
+            keys = self.sets_by_node.get(node)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.sets_by_node[node]
+
+    def rekey_set(self, old_key, new_key):
+        nodes = self.nodes_by_set.pop(old_key, set())
+        self.nodes_by_set[new_key] = nodes
+        for node in nodes:
+            keys = self.sets_by_node[node]
+            keys.discard(old_key)
+            keys.add(new_key)
+
+    def rename_set(self, tab_name, old_name, new_name):
+        self.rekey_set((tab_name, old_name), (tab_name, new_name))
+
+    def move_set(self, name, old_tab, new_tab):
+        self.rekey_set((old_tab, name), (new_tab, name))
+
+    def remove_tab(self, tab_name, names=()):
+        for name in names:
+            self.remove_set(tab_name, name)
+
+    def rename_tab(self, old_name, new_name, names=()):
+        for name in names:
+            self.rekey_set((old_name, name), (new_name, name))
+
+    def sets_containing(self, paths):
+        # tab name -> names of the sets storing any of the given nodes or components
+        matches = {}
+        for node in {node_of(path) for path in paths}:
+            for tab_name, name in self.sets_by_node.get(node, ()):
+                matches.setdefault(tab_name, set()).add(name)
+        return matches
+
+class SelectionValidator(object):
+    # Checks the stored members of every set against the scene with one batched query. The
+    # result is reused until the scene generation changes; edited tabs are marked stale and only
+    # their sets are checked again. Members that are not found under their stored path are only
+    # missing if their UUID is gone as well.
+    def __init__(self, scene_generation, resolver):
+        self.scene_generation = scene_generation
+        self.resolver = resolver
+        self.missing = {}  # (tab name, set name) -> stored paths whose node no longer exists
+        self.generation = None
+        self.stale_tabs = set()
+
+    def invalidate(self, tabs=None):
+        # tabs lists the edited tabs; None drops the whole result
+        if tabs is None:
+            self.generation = None
+        else:
+            self.stale_tabs.update(tabs)
+
+    def is_current(self, tab_name=None):
+        if self.generation != self.scene_generation.value:
+            return False
+        return not self.stale_tabs if tab_name is None else tab_name not in self.stale_tabs
+
+    def validate(self, selection_dict):
+        if self.generation != self.scene_generation.value:
+            self.missing = self.check(selection_dict, selection_dict)
+        else:
+            # Sets of deleted and renamed tabs or sets are dropped along with those of the edited tabs
+            self.missing = {key: paths for key, paths in self.missing.items()
+                            if key[0] not in self.stale_tabs and key[1] in selection_dict.get(key[0], ())}
+            if self.stale_tabs:
+                self.missing.update(self.check(selection_dict, self.stale_tabs))
+        self.generation = self.scene_generation.value
+        self.stale_tabs = set()
+        return self.missing
+
+    def check(self, selection_dict, tab_names):
+        members = {}
+        uuids = {}  # stored path -> UUID
+        for tab_name in tab_names:
+            for name, data in selection_dict.get(tab_name, {}).items():
+                if isinstance(data.get('objects'), list):
+                    members[(tab_name, name)] = data['objects'] + [entry[0] for entry in data.get('components', ())]
+                    stored_uuids = data.get('uuids')
+                    if stored_uuids and len(stored_uuids) == len(data['objects']):
+                        uuids.update(zip(data['objects'], stored_uuids))
+                    uuids.update((entry[0], entry[1]) for entry in data.get('components', ()))
+        missing_paths = self.missing_paths([path for objects in members.values() for path in objects])
+        # Renamed and reparented members are found again through their UUID
+        missing_paths = {path for path in missing_paths if not (uuids.get(path) and self.resolver.path_of(uuids[path]))}
+        missing = {}
+        if missing_paths:
+            for key, objects in members.items():
+                dead = [path for path in objects if path in missing_paths]
+                if dead:
+                    missing[key] = dead
+        return missing
+
+    def missing_paths(self, paths):
+        nodes = {node_of(path) for path in paths}
+        if not nodes:
+            return set()
+        found = set(cmds.ls(list(nodes), long=True))
+        # Nodes ls reports under another name (short or ambiguous paths) are confirmed one by one
+        dead = {node for node in nodes - found if not cmds.objExists(node)}
+        return {path for path in paths if node_of(path) in dead}
+
+def write_selection_file(file_path, selection_dict):
+    # Writes one tab per step and yields the number of tabs written. The data goes to a temporary
+    # file that only replaces file_path once complete, so closing the generator early (cancel)
+    # leaves an existing file untouched.
+    temp_path = file_path + '.tmp'
+    completed = False
+    try:
+        with open(temp_path, 'w') as f:
+            f.write('{')
+            for index, (tab_name, selections) in enumerate(list(selection_dict.items())):
+                if index:
+                    f.write(', ')
+                f.write(json.dumps(tab_name))
+                f.write(': ')
+                f.write(json.dumps(selections))
+                yield index + 1
+            f.write('}')
+        os.replace(temp_path, file_path)
+        completed = True
+    finally:
+        if not completed and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+class SelectionFileReader(object):
+    # Reads a {tab: {set: data}} JSON file one tab at a time. Only the current tab and the unread
+    # part of the buffer are held in memory, whatever the size of the file.
+    chunk_size = 1 << 16
+
+    def __init__(self, file_path):
+        self.file = open(file_path, 'r')
+        self.size = max(1, os.fstat(self.file.fileno()).st_size)
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.chars_read = 0
+        self.at_end = False
+
+    def close(self):
+        self.file.close()
+
+    def progress(self):
+        # Percent of the file read so far
+        return min(100, int(self.chars_read * 100 / self.size))
+
+    def read_more(self, size):
+        chunk = self.file.read(size)
+        if not chunk:
+            self.at_end = True
+        self.chars_read += len(chunk)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def next_char(self):
+        # The next character that is not whitespace, or '' at the end of the file
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer) or self.at_end:
+                return self.buffer[self.position:self.position + 1]
+            self.read_more(self.chunk_size)
+
+    def expect(self, characters):
+        char = self.next_char()
+        if not char or char not in characters:
+            raise ValueError(f"Expected one of '{characters}' at character {self.chars_read - len(self.buffer) + self.position}")
+        self.position += 1
+        return char
+
+    def decode(self):
+        # Reads until the next value is complete; each retry at least doubles the buffer
+        self.next_char()
+        while True:
+            try:
+                value, self.position = self.decoder.raw_decode(self.buffer, self.position)
+                return value
+            except json.JSONDecodeError:
+                if self.at_end:
+                    raise
+                self.read_more(max(self.chunk_size, len(self.buffer)))
+
+    def tabs(self):
+        self.expect('{')
+        if self.next_char() == '}':
+            return
+        while True:
+            tab_name = self.decode()
+            self.expect(':')
+            yield tab_name, self.decode()
+            if self.expect(',}') == '}':
+                return
+
+class SelectionFileWorker(QtCore.QThread):
+    # Runs an export or import on a worker thread. Progress and results come back through
+    # queued signals, so the scene data is only read and changed on the main thread.
+    progress_changed = QtCore.Signal(int)
+    succeeded = QtCore.Signal(object)
+    failed = QtCore.Signal(str)
+    cancelled = QtCore.Signal(str)
+
+    def __init__(self, task, file_path, selection_dict=None, parent=None):
+        super(SelectionFileWorker, self).__init__(parent)
+        self.task = task  # 'export' or 'import'
+        self.file_path = file_path
+        self.selection_dict = selection_dict
+
+    def run(self):
+        action = "save" if self.task == 'export' else "load"
+        try:
+            result = self.export_tabs() if self.task == 'export' else self.import_tabs()
+        except (OSError, ValueError) as error:
+            self.failed.emit(f"Could not {action} selection data: {error}")
+            return
+        # A cancel that arrives after the last tab was handled no longer stops the task
+        if result is None:
+            self.cancelled.emit(f"{action.capitalize()} of selection data was cancelled.")
+        else:
+            self.succeeded.emit(result)
+
+    def export_tabs(self):
+        writer = write_selection_file(self.file_path, self.selection_dict)
+        for written_tabs in writer:
+            self.progress_changed.emit(written_tabs)
+            if self.isInterruptionRequested():
+                writer.close()
+                return None
+        return self.file_path
+
+    def import_tabs(self):
+        reader = SelectionFileReader(self.file_path)
+        tabs = []
+        try:
+            for tab in reader.tabs():
+                tabs.append(tab)
+                self.progress_changed.emit(reader.progress())
+                if self.isInterruptionRequested():
+                    return None
+        finally:
+            reader.close()
+        return tabs
+
+class NameAllocator(object):
+    # Hands out unique names (name, name_1, name_02, ...). The highest suffix given for each
+    # base name is remembered, so a run of repeated names continues where the last one stopped
+    # instead of probing every suffix again. Names are always checked against the live
+    # container, so a stale suffix can only skip numbers, never produce a duplicate.
+    def __init__(self):
+        self.suffixes = {}  # (scope, base name) -> highest suffix handed out
+
+    def allocate(self, name, taken, scope=None):
+        if name not in taken:
+            return name
+        key = (scope, name)
+        counter = self.suffixes.get(key, 0)
+        while True:
+            counter += 1
+            candidate = suffixed_name(name, counter)
+            if candidate not in taken:
+                self.suffixes[key] = counter
+                return candidate
+
+    def clear(self):
+        self.suffixes.clear()
+
+class SelectionMerger(object):
+    # Merges loaded tabs into a copy of the current data. Set names are looked up in an index
+    # built once, so each collision check is a dictionary lookup. The current data is never
+    # changed, so a merge doubles as a dry run: report lists what applying it would do.
+    policies = ('rename', 'skip', 'overwrite', 'union')
+
+    def __init__(self, current_data, policy='rename', names=None):
+        self.policy = policy
+        self.merged = {tab_name: dict(selections) for tab_name, selections in current_data.items()}
+        self.set_tabs = {name: tab_name for tab_name, selections in self.merged.items() for name in selections}
+        self.names = names if names is not None else NameAllocator()  # shared with the window's create and rename paths
+        self.next_orders = {}  # tab name -> order of the next set appended to it
+        self.replaced = []  # data of the existing sets that were overwritten
+        self.report = []
+
+    def merge(self, tabs):
+        for tab_name, selections in tabs:
+            self.merge_tab(tab_name, selections)
+        return self.merged
+
+    def merge_tab(self, tab_name, selections):
+        # Renaming keeps every loaded tab separate; the other policies merge into a tab of the same name
+        if self.policy == 'rename' or tab_name not in self.merged:
+            target_tab = self.names.allocate(tab_name, self.merged, 'tab')
+            self.merged[target_tab] = {}
+            self.report.append(f"Add tab '{target_tab}'" + (f" (renamed from '{tab_name}')" if target_tab != tab_name else ""))
+        else:
+            target_tab = tab_name
+
+        for name, selection_data in sorted(selections.items(), key=lambda item: item[1].get('order', 0)):
+            existing_tab = self.set_tabs.get(name)
+            if existing_tab is None:
+                self.add_set(target_tab, name, selection_data)
+            elif self.policy == 'rename':
+                self.add_set(target_tab, self.names.allocate(name, self.set_tabs, 'set'), selection_data, name)
+            elif self.policy == 'skip':
+                self.report.append(f"Skip '{name}' (already in tab '{existing_tab}')")
+            elif self.policy == 'union':
+                current = self.merged[existing_tab][name]
+                if 'objects' in selection_data and 'objects' in current:
+                    self.merged[existing_tab][name] = self.union_members(current, selection_data)
+                    added = len(self.merged[existing_tab][name]['objects']) - len(current['objects'])
+                    self.report.append(f"Merge members of '{name}' in tab '{existing_tab}' ({added} objects added)")
+                else:
+                    # Rule and objectSet-backed sets do not store paths to merge, so both are left as they are
+                    self.report.append(f"Skip '{name}' (rule or object set, cannot merge members)")
+            else:
+                self.replaced.append(self.merged[existing_tab][name])
+                order = self.merged[existing_tab][name].get('order', 0)
+                self.merged[existing_tab][name] = dict(selection_data, order=order)
+                self.report.append(f"Overwrite '{name}' in tab '{existing_tab}'")
+
+    def add_set(self, tab_name, name, selection_data, original_name=None):
+        if tab_name not in self.next_orders:
+            self.next_orders[tab_name] = max((data.get('order', 0) for data in self.merged[tab_name].values()), default=-1) + 1
+        self.merged[tab_name][name] = dict(selection_data, order=self.next_orders[tab_name])
+        self.next_orders[tab_name] += 1
+        self.set_tabs[name] = tab_name
+        self.report.append(f"Add '{name}' to tab '{tab_name}'" + (f" (renamed from '{original_name}')" if original_name else ""))
+
+    def union_members(self, current, incoming):
+        merged = dict(current)
+        merged['objects'] = list(dict.fromkeys(current['objects'] + incoming['objects']))
+        path_uuids = {}
+        for data in (incoming, current):
+            if data.get('uuids') and len(data['uuids']) == len(data['objects']):
+                path_uuids.update(zip(data['objects'], data['uuids']))
+        merged['uuids'] = [path_uuids.get(path) for path in merged['objects']]
+        components = {}
+        for data in (current, incoming):
+            for node, uuid, component_type, ranges in data.get('components', ()):
+                key = (node, component_type)
+                if key in components:
+                    components[key][3] = combine_ranges('union', components[key][3], ranges)
+                else:
+                    components[key] = [node, uuid, component_type, list(ranges)]
+        merged['components'] = list(components.values())
+        return merged
 
 class CustomDialog(QtWidgets.QDialog):
     def __init__(self, parent=None, title="", size=(250, 150)):
@@ -107,21 +1233,42 @@ class CustomDialog(QtWidgets.QDialog):
         return accept_button, close_button
     
 class DraggableButton(QtWidgets.QPushButton):
+    # Shared by every selection button through the page stack; colors are added per color in use
+    style_sheet = '''
+        QPushButton#selectionButton {background-color: #4d4d4d;color: white;border-radius: 3px;padding: 2px;}
+        QPushButton#selectionButton:hover {background-color: #5a5a5a;}
+        QPushButton#selectionButton[highlighted="true"] {border: 1px solid #00ade6;}
+        QPushButton#selectionButton[stale="true"] {color: #ff9e57;}
+        QToolTip {background-color: #5285a6;color: white;border: 0px;}
+    '''
+
     def __init__(self, text, parent=None):
         super(DraggableButton, self).__init__(text, parent)
-        self.setStyleSheet('''
-            QPushButton {background-color: #4d4d4d;color: white;border-radius: 3px;padding: 2px;}
-            QPushButton:hover {background-color: #5a5a5a;}
-            QToolTip {background-color: #5285a6;color: white;border: 0px;}
-        ''')
+        self.setObjectName("selectionButton")
         self.setFixedHeight(22)
         self.setToolTip("Select Sets")
         self.setFixedWidth(self.calculate_button_width(text))
 
     def calculate_button_width(self, text, padding=20):
-        font_metrics = QtGui.QFontMetrics(QtWidgets.QApplication.font())
-        text_width = font_metrics.horizontalAdvance(text)
-        return text_width + padding
+        return text_width(text) + padding
+
+    def set_color(self, color):
+        self.set_style_property("buttonColor", color)
+
+    def set_highlighted(self, highlighted):
+        self.set_style_property("highlighted", highlighted)
+
+    def set_missing_count(self, count):
+        self.set_style_property("stale", count > 0)
+        self.setToolTip(f"Select {self.text()} set ({count} missing)" if count else f"Select {self.text()} set")
+
+    def set_style_property(self, name, value):
+        if self.property(name) == value:
+            return
+        self.setProperty(name, value)
+        if self.testAttribute(QtCore.Qt.WA_WState_Polished):
+            self.style().unpolish(self)
+            self.style().polish(self)
 
     def mousePressEvent(self, event):
         if event.button() == QtCore.Qt.MiddleButton:
@@ -139,6 +1286,279 @@ class DraggableButton(QtWidgets.QPushButton):
             drag.setMimeData(mime_data)
             drag.exec_(QtCore.Qt.MoveAction)
 
+class SelectionButtonPage(QtWidgets.QWidget):
+    # One tab's selection sets as a row of DraggableButtons
+    item_clicked = QtCore.Signal(str)
+    item_context_menu = QtCore.Signal(str, QtCore.QPoint)
+    item_moved = QtCore.Signal(str, int)
+
+    def __init__(self, spacing=6, parent=None):
+        super(SelectionButtonPage, self).__init__(parent)
+        self.buttons = {}
+        self.button_layout = QtWidgets.QHBoxLayout(self)
+        self.button_layout.setContentsMargins(0, 0, 0, 0)
+        self.button_layout.setSpacing(spacing)
+        self.button_layout.setAlignment(QtCore.Qt.AlignLeft)
+        self.setAcceptDrops(True)
+
+    def set_items(self, items):
+        for name, color in items:
+            self.add_item(name, color)
+
+    def add_item(self, name, color=None, index=-1):
+        button = DraggableButton(name)
+        button.clicked.connect(lambda checked=False, btn=button: self.item_clicked.emit(btn.text()))
+        button.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        button.customContextMenuRequested.connect(lambda pos, btn=button: self.item_context_menu.emit(btn.text(), btn.mapToGlobal(pos)))
+        button.setToolTip(f"Select {name} set")
+        if color:
+            button.set_color(color)
+        self.buttons[name] = button
+        self.button_layout.insertWidget(index, button)
+
+    def remove_item(self, name):
+        button = self.buttons.pop(name, None)
+        if button is not None:
+            self.button_layout.removeWidget(button)
+            button.deleteLater()
+
+    def rename_item(self, old_name, new_name):
+        button = self.buttons.pop(old_name)
+        self.buttons[new_name] = button
+        button.setText(new_name)
+        button.setFixedWidth(button.calculate_button_width(new_name))
+        button.setToolTip(f"Select {new_name} set")
+
+    def set_item_color(self, name, color):
+        self.buttons[name].set_color(color)
+
+    def move_item(self, name, index):
+        button = self.buttons[name]
+        self.button_layout.removeWidget(button)
+        self.button_layout.insertWidget(index, button)
+
+    def set_highlighted(self, names):
+        for name, button in self.buttons.items():
+            button.set_highlighted(name in names)
+
+    def set_missing_counts(self, counts):
+        for name, button in self.buttons.items():
+            button.set_missing_count(counts.get(name, 0))
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasText():
+            event.acceptProposedAction()
+        activate_maya_window()
+
+    def dragMoveEvent(self, event):
+        event.acceptProposedAction()
+        activate_maya_window()
+
+    def dropEvent(self, event):
+        source_button = event.source()
+        target_position = self.button_layout.indexOf(self.childAt(event.pos()))
+        if source_button in self.buttons.values() and target_position != -1:
+            self.move_item(source_button.text(), target_position)
+            self.item_moved.emit(source_button.text(), target_position)
+
+        event.acceptProposedAction()
+        activate_maya_window()
+
+class SelectionStrip(QtWidgets.QWidget):
+    # One tab's selection sets painted as chips by a single widget, for tabs too large for a
+    # button per set. Only the chips inside the visible width are drawn; the wheel scrolls.
+    item_clicked = QtCore.Signal(str)
+    item_context_menu = QtCore.Signal(str, QtCore.QPoint)
+    item_moved = QtCore.Signal(str, int)
+
+    chip_height = 22
+    chip_padding = 20
+    max_width = 800
+    default_color = "#4d4d4d"
+    highlight_color = "#00ade6"
+    stale_text_color = "#ff9e57"
+
+    def __init__(self, spacing=6, parent=None):
+        super(SelectionStrip, self).__init__(parent)
+        self.spacing = spacing
+        self.names = []
+        self.colors = {}
+        self.highlighted = set()
+        self.missing_counts = {}
+        self.offsets = []  # left edge of each chip in strip coordinates
+        self.widths = []
+        self.total_width = 0
+        self.scroll = 0
+        self.hover_index = -1
+        self.press_index = -1
+        self.drag_index = -1
+        self.drop_index = -1
+        self.drag_start_position = None
+        self.brushes = {}
+        self.setMouseTracking(True)
+        self.setFixedHeight(self.chip_height)
+        self.setToolTip("Select Sets")
+
+    def set_items(self, items):
+        for name, color in items:
+            self.names.append(name)
+            self.colors[name] = color
+        self.relayout()
+
+    def add_item(self, name, color=None, index=-1):
+        self.names.insert(len(self.names) if index == -1 else index, name)
+        self.colors[name] = color
+        self.relayout()
+
+    def remove_item(self, name):
+        if name in self.colors:
+            self.names.remove(name)
+            del self.colors[name]
+            self.relayout()
+
+    def rename_item(self, old_name, new_name):
+        self.names[self.names.index(old_name)] = new_name
+        self.colors[new_name] = self.colors.pop(old_name)
+        self.relayout()
+
+    def set_item_color(self, name, color):
+        self.colors[name] = color
+        self.update()
+
+    def move_item(self, name, index):
+        self.names.remove(name)
+        self.names.insert(index, name)
+        self.relayout()
+
+    def set_highlighted(self, names):
+        names = set(names)
+        if names != self.highlighted:
+            self.highlighted = names
+            self.update()
+
+    def set_missing_counts(self, counts):
+        if counts != self.missing_counts:
+            self.missing_counts = dict(counts)
+            self.update()
+
+    def relayout(self):
+        self.widths = [text_width(name) + self.chip_padding for name in self.names]
+        self.offsets = []
+        x = 0
+        for width in self.widths:
+            self.offsets.append(x)
+            x += width + self.spacing
+        self.total_width = max(0, x - self.spacing)
+        self.hover_index = -1
+        self.scroll_to(self.scroll)
+        self.updateGeometry()
+        self.update()
+
+    def sizeHint(self):
+        return QtCore.QSize(min(self.total_width, self.max_width), self.chip_height)
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def scroll_to(self, value):
+        self.scroll = int(min(max(value, 0), max(0, self.total_width - self.width())))
+
+    def index_at(self, pos):
+        x = pos.x() + self.scroll
+        index = bisect.bisect_right(self.offsets, x) - 1
+        if 0 <= index and x < self.offsets[index] + self.widths[index]:
+            return index
+        return -1
+
+    def brush(self, color):
+        if color not in self.brushes:
+            self.brushes[color] = QColor(color)
+        return self.brushes[color]
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setPen(QtCore.Qt.NoPen)
+        visible_width = self.width()
+        first = max(0, bisect.bisect_right(self.offsets, self.scroll) - 1)
+        for index in range(first, len(self.names)):
+            x = self.offsets[index] - self.scroll
+            if x >= visible_width:
+                break
+            name = self.names[index]
+            color = self.colors.get(name) or self.default_color
+            if index == self.hover_index or index == self.drop_index:
+                color = lighten_color(color)
+            rect = QtCore.QRectF(x, 0, self.widths[index], self.chip_height)
+            painter.setBrush(self.brush(color))
+            if name in self.highlighted:
+                painter.setPen(self.brush(self.highlight_color))
+                painter.drawRoundedRect(rect.adjusted(0.5, 0.5, -0.5, -0.5), 3, 3)
+            else:
+                painter.drawRoundedRect(rect, 3, 3)
+            painter.setPen(self.brush(self.stale_text_color) if self.missing_counts.get(name) else QtCore.Qt.white)
+            painter.drawText(rect, QtCore.Qt.AlignCenter, name)
+            painter.setPen(QtCore.Qt.NoPen)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        index = self.index_at(event.pos())
+        if event.button() == QtCore.Qt.LeftButton:
+            self.press_index = index
+        elif event.button() == QtCore.Qt.MiddleButton and index != -1:
+            self.drag_index = index
+            self.drag_start_position = event.pos()
+        elif event.button() == QtCore.Qt.RightButton and index != -1:
+            self.item_context_menu.emit(self.names[index], self.mapToGlobal(event.pos()))
+
+    def mouseMoveEvent(self, event):
+        index = self.index_at(event.pos())
+        if self.drag_index != -1:
+            if (event.pos() - self.drag_start_position).manhattanLength() >= QtWidgets.QApplication.startDragDistance():
+                if index != self.drop_index:
+                    self.drop_index = index
+                    self.update()
+        elif index != self.hover_index:
+            self.hover_index = index
+            if index == -1:
+                self.setToolTip("Select Sets")
+            elif self.missing_counts.get(self.names[index]):
+                self.setToolTip(f"Select {self.names[index]} set ({self.missing_counts[self.names[index]]} missing)")
+            else:
+                self.setToolTip(f"Select {self.names[index]} set")
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        index = self.index_at(event.pos())
+        if event.button() == QtCore.Qt.LeftButton:
+            if index != -1 and index == self.press_index:
+                self.item_clicked.emit(self.names[index])
+            self.press_index = -1
+        elif event.button() == QtCore.Qt.MiddleButton and self.drag_index != -1:
+            if self.drop_index != -1 and self.drop_index != self.drag_index:
+                name = self.names[self.drag_index]
+                target_position = self.drop_index
+                self.move_item(name, target_position)
+                self.item_moved.emit(name, target_position)
+            self.drag_index = self.drop_index = -1
+            self.update()
+        activate_maya_window()
+
+    def leaveEvent(self, event):
+        if self.hover_index != -1:
+            self.hover_index = -1
+            self.update()
+        super(SelectionStrip, self).leaveEvent(event)
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y() or event.angleDelta().x()
+        self.scroll_to(self.scroll - delta)
+        self.update()
+
+    def resizeEvent(self, event):
+        self.scroll_to(self.scroll)
+        super(SelectionStrip, self).resizeEvent(event)
+
 class ColorButton(QtWidgets.QPushButton):
     def __init__(self, color, parent=None):
         super(ColorButton, self).__init__(parent)
@@ -148,23 +1568,33 @@ class ColorButton(QtWidgets.QPushButton):
 class TabButton(QtWidgets.QPushButton):
     tab_clicked = QtCore.Signal(str)
 
+    # Shared by every tab button through the tab frame; the active tab is picked by property
+    style_sheet = '''
+        QPushButton#tabButton {
+            background-color: #4d4d4d;
+            color: white;
+            border-radius: 8px;
+            padding: 0px 0px 1px 0px;
+            font-size: 10px;
+        }
+        QPushButton#tabButton:hover {background-color: #5a5a5a;}
+        QPushButton#tabButton[active="true"] {background-color: #5285a6;}
+        QPushButton#tabButton[active="true"]:hover {background-color: #6295b6;}
+        QToolTip {background-color: #5285a6;color: white;border: 0px;}
+    '''
+
     def __init__(self, text, parent=None):
         super(TabButton, self).__init__(text, parent)
         self.tab_name = text
-        self.setStyleSheet('''
-        QPushButton {background-color: #4d4d4d;color: white;border-radius: 8px;padding: 1px; font-size: 10px;}
-        QPushButton:hover {background-color: #5a5a5a;}
-        QToolTip {background-color: #5285a6;color: white;border: 0px;}
-        ''')
+        self.setObjectName("tabButton")
+        self.setProperty("active", False)
         self.setFixedHeight(16)
         self.setFixedWidth(self.calculate_button_width(text))
         self.setToolTip('Select Tab')
         self.clicked.connect(self.on_clicked)
 
     def calculate_button_width(self, text, padding=10):
-        font_metrics = QtGui.QFontMetrics(QtWidgets.QApplication.font())
-        text_width = font_metrics.horizontalAdvance(text)
-        return text_width + padding
+        return text_width(text) + padding
 
     def mousePressEvent(self, event):
         if event.button() == QtCore.Qt.LeftButton:
@@ -174,9 +1604,35 @@ class TabButton(QtWidgets.QPushButton):
     def on_clicked(self):
         self.tab_clicked.emit(self.tab_name)
 
+    def set_active(self, active):
+        if self.property("active") == active:
+            return
+        self.setProperty("active", active)
+        self.style().unpolish(self)
+        self.style().polish(self)
+
+    def set_tab_name(self, tab_name):
+        self.tab_name = tab_name
+        self.setText(tab_name)
+        self.setFixedWidth(self.calculate_button_width(tab_name))
+
 class SelectSetToolWindow(QtWidgets.QWidget):
+    max_tab_pages = 8  # built tab pages kept alive; older ones are released back to names
+    strip_view_threshold = 40  # tabs with more sets than this are painted as a SelectionStrip
+    chord_modifier = QtCore.Qt.AltModifier  # sets clicked while held are combined and selected on release
+    selection_backend = 'cmds'  # 'cmds' uses undoable cmds.select calls; 'api' applies cached MSelectionLists, which is faster but not undoable
+    object_set_backing = False  # new sets keep their members in an objectSet node instead of the JSON data
+    capture_soft_selection = False  # new sets also store soft selection weights when soft select is on
+    object_set_select_flags = {'replace': 'replace', 'union': 'add', 'subtract': 'deselect'}
+    api_list_adjustments = {
+        'replace': om.MGlobal.kReplaceList,
+        'union': om.MGlobal.kAddToList,
+        'subtract': om.MGlobal.kRemoveFromList,
+    }
+
     def __init__(self, parent=None):
         super(SelectSetToolWindow, self).__init__(maya_main_window(), QtCore.Qt.Window | QtCore.Qt.FramelessWindowHint)
+        open_start = time.perf_counter()
         self.setWindowTitle("SelectSetTool")
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground)
         self.setAttribute(QtCore.Qt.WA_NoSystemBackground)
@@ -189,9 +1645,25 @@ class SelectSetToolWindow(QtWidgets.QWidget):
             QPushButton {background-color: #333333;color: white;border-radius: 3px;padding: 5px;}
             QPushButton:hover {background-color: #5a5a5a;}
         ''')
-        self.tabs = {}
+        self.tabs = {}  # tab name -> ordered selection names
+        self.tab_buttons = {}  # tab name -> TabButton, kept alive across tab switches
+        self.tab_pages = OrderedDict()  # tab name -> SelectionButtonPage or SelectionStrip, least recently shown first
+        self.strip_view_enabled = False
         self.current_tab = None
+        self.data_store = SelectionDataStore(on_external_change=self.on_selection_data_changed_externally)
+        self.search_index = SelectionSearchIndex()
+        self.name_allocator = NameAllocator()
+        self.search_results = {}  # completion text -> (kind, tab name, name)
+        self.membership_index = SelectionMembershipIndex()
+        self.highlighted_sets = {}  # tab name -> names of the sets containing the Maya selection
+        self.missing_counts = {}  # tab name -> {set name: stored members missing from the scene}
+        self.file_workers = set()  # running SelectionFileWorkers
+        self.import_overwrite = True
+        self.import_policy = 'rename'
+        self.import_preview = False
         self.setup_ui()
+        for screen in QtGui.QGuiApplication.screens():
+            screen.logicalDotsPerInchChanged.connect(self.on_style_environment_changed)
         
         self.setup_connections()
 
@@ -219,6 +1691,9 @@ class SelectSetToolWindow(QtWidgets.QWidget):
 
         self.context_menu_open = False
 
+        set_count = sum(len(names) for names in self.tabs.values())
+        print(f"Save Selection Tool opened in {(time.perf_counter() - open_start) * 1000:.1f} ms ({len(self.tabs)} tabs, {set_count} sets)")
+
     def setup_ui(self):
         self.mainLayout = QtWidgets.QHBoxLayout(self)
         self.mainLayout.setContentsMargins(0, 0, 0, 0)
@@ -242,7 +1717,7 @@ class SelectSetToolWindow(QtWidgets.QWidget):
 
         tabFrame = QtWidgets.QFrame()
         #tabFrameLayout = QtWidgets.QHBoxLayout(tabFrame)
-        tabFrame.setStyleSheet("QFrame { border: 0px solid gray; border-radius: 12px; background-color: rgba(30, 30, 30, .6); }")
+        tabFrame.setStyleSheet("QFrame { border: 0px solid gray; border-radius: 12px; background-color: rgba(30, 30, 30, .6); }" + TabButton.style_sheet)
         tabFrame.setFixedHeight(24)
 
 
@@ -253,6 +1728,16 @@ class SelectSetToolWindow(QtWidgets.QWidget):
 
         topFrameLayout.addStretch()
 
+        self.searchField = QtWidgets.QLineEdit()
+        self.searchField.setPlaceholderText("Search")
+        self.searchField.setFixedSize(100, 20)
+        self.searchField.setStyleSheet("QLineEdit {border-radius: 3px; background-color: rgba(30, 30, 30, .6);}")
+        self.searchModel = QtCore.QStringListModel(self)
+        self.searchCompleter = QtWidgets.QCompleter(self.searchModel, self)
+        self.searchCompleter.setCompletionMode(QtWidgets.QCompleter.UnfilteredPopupCompletion)
+        self.searchCompleter.setWidget(self.searchField)
+        topFrameLayout.addWidget(self.searchField)
+
         self.setup_close_button(topFrameLayout)
         frameLayout.addLayout(topFrameLayout)
 
@@ -275,6 +1760,11 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         self.selectionButtonsLayout.setContentsMargins(sblm, sblm, sblm, sblm)
         self.selectionButtonsLayout.setSpacing(sblm)
         self.selectionButtonsLayout.setAlignment(QtCore.Qt.AlignLeft)
+        # Each recently used tab keeps a prebuilt page of buttons, so switching tabs is a page flip
+        self.selectionPages = QtWidgets.QStackedWidget()
+        self.selectionButtonsLayout.addWidget(self.selectionPages)
+        self.button_colors = set()
+        self.register_button_colors(["#4d4d4d"])
         frameLayout.addWidget(selectionButtonsFrame)
         
 
@@ -321,6 +1811,8 @@ class SelectSetToolWindow(QtWidgets.QWidget):
 
         store_action = menu.addAction("Store Selection Data")
         load_action = menu.addAction("Load Selection Data")
+        hierarchy_action = menu.addAction("Save Hierarchy Set")
+        query_action = menu.addAction("Save Query Set")
 
         action = menu.exec_(self.saveSelectionButton.mapToGlobal(pos))
 
@@ -328,55 +1820,129 @@ class SelectSetToolWindow(QtWidgets.QWidget):
             self.store_selection_data()
         elif action == load_action:
             self.load_selection_data()
+        elif action == hierarchy_action:
+            self.save_hierarchy_set()
+        elif action == query_action:
+            self.save_query_set()
 
     def store_selection_data(self):
         file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Selection Data", "", "JSON Files (*.json)")
         if file_path:
-            selection_dict = self.get_selection_dict()
-            with open(file_path, 'w') as f:
-                json.dump(selection_dict, f)
-            cmds.inViewMessage(amg=f"Selection data saved to {file_path}", pos='midCenter', fade=True)
+            # The worker encodes a copy, so edits made while it runs cannot change the data under it
+            snapshot = {tab_name: {name: dict(data) for name, data in selections.items()}
+                        for tab_name, selections in self.get_selection_dict().items()}
+            progress = self.create_progress_dialog("Saving selection data...", len(snapshot))
+            worker = SelectionFileWorker('export', file_path, snapshot, self)
+            worker.succeeded.connect(self.on_selection_data_stored)
+            self.start_file_worker(worker, progress)
 
     def load_selection_data(self):
         file_path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load Selection Data", "", "JSON Files (*.json)")
         if file_path:
-            with open(file_path, 'r') as f:
-                loaded_data = json.load(f)
-            
-            dialog = CustomDialog(self, "Load Options", (200, 130))
+            dialog = CustomDialog(self, "Load Options", (220, 230))
             dialog.add_widget(QtWidgets.QLabel("Choose load option:"))
             overwrite_radio = QtWidgets.QRadioButton("Overwrite existing data")
             add_radio = QtWidgets.QRadioButton("Add to existing data")
             overwrite_radio.setChecked(True)
             dialog.add_widget(overwrite_radio)
             dialog.add_widget(add_radio)
+            policy_combo = QtWidgets.QComboBox()
+            policy_combo.setFixedHeight(28)
+            policy_combo.addItems(["Rename duplicates", "Skip duplicates", "Overwrite duplicates", "Merge members of duplicates"])
+            policy_combo.setCurrentIndex(SelectionMerger.policies.index(self.import_policy))
+            dialog.add_widget(policy_combo)
+            preview_check = QtWidgets.QCheckBox("Preview changes before merging")
+            preview_check.setStyleSheet("QCheckBox {color: white;}")
+            preview_check.setChecked(self.import_preview)
+            dialog.add_widget(preview_check)
             dialog.add_button_box()
 
+            def toggle_merge_options():
+                policy_combo.setEnabled(add_radio.isChecked())
+                preview_check.setEnabled(add_radio.isChecked())
+
+            add_radio.toggled.connect(toggle_merge_options)
+            toggle_merge_options()
+
             if dialog.exec_() == QtWidgets.QDialog.Accepted:
-                if overwrite_radio.isChecked():
-                    self.save_selection_dict(loaded_data)
-                else:
-                    current_data = self.get_selection_dict()
-                    new_data = self.merge_selection_data(current_data, loaded_data)
-                    self.save_selection_dict(new_data)
-                
-                self.refresh_ui()
-                cmds.inViewMessage(amg="Selection data loaded successfully", pos='midCenter', fade=True)
+                self.import_overwrite = overwrite_radio.isChecked()
+                self.import_policy = SelectionMerger.policies[policy_combo.currentIndex()]
+                self.import_preview = preview_check.isChecked()
+                progress = self.create_progress_dialog("Loading selection data...", 100)
+                worker = SelectionFileWorker('import', file_path, parent=self)
+                worker.succeeded.connect(self.on_selection_data_loaded)
+                self.start_file_worker(worker, progress)
+
+    def start_file_worker(self, worker, progress):
+        worker.progress_changed.connect(progress.setValue)
+        worker.failed.connect(self.on_file_worker_stopped)
+        worker.cancelled.connect(self.on_file_worker_stopped)
+        worker.finished.connect(progress.close)
+        worker.finished.connect(self.on_file_worker_finished)
+        progress.canceled.connect(worker.requestInterruption)
+        self.file_workers.add(worker)
+        worker.start()
+
+    def on_file_worker_finished(self):
+        for worker in [worker for worker in self.file_workers if worker.isFinished()]:
+            self.file_workers.discard(worker)
+            worker.deleteLater()
+
+    def on_file_worker_stopped(self, message):
+        cmds.warning(message)
+
+    def on_selection_data_stored(self, file_path):
+        cmds.inViewMessage(amg=f"Selection data saved to {file_path}", pos='midCenter', fade=True)
+
+    def on_selection_data_loaded(self, tabs):
+        # Only the merge into the scene data happens on the main thread
+        if self.import_overwrite:
+            new_data = dict(tabs)
+            replaced = [data for selections in self.get_selection_dict().values() for data in selections.values()]
+        else:
+            merger = SelectionMerger(self.get_selection_dict(), self.import_policy, self.name_allocator)
+            new_data = merger.merge(tabs)
+            if self.import_preview and not self.confirm_merge(merger):
+                return
+            replaced = merger.replaced
+
+        self.delete_replaced_object_sets(replaced, new_data)
+        self.save_selection_dict(new_data)
+        self.refresh_ui()
+        cmds.inViewMessage(amg="Selection data loaded successfully", pos='midCenter', fade=True)
+
+    def confirm_merge(self, merger):
+        # Dry run report: the merge result is only saved if accepted
+        dialog = CustomDialog(self, "Merge Preview", (420, 320))
+        dialog.add_widget(QtWidgets.QLabel(f"Merging will make {len(merger.report)} changes:"))
+        report_view = QtWidgets.QPlainTextEdit()
+        report_view.setReadOnly(True)
+        report_view.setStyleSheet("QPlainTextEdit {background-color: #333333; color: white; border: none;}")
+        for line in merger.report:
+            report_view.appendPlainText(line)
+        report_view.moveCursor(QtGui.QTextCursor.Start)
+        dialog.add_widget(report_view)
+        dialog.add_button_box()
+        return dialog.exec_() == QtWidgets.QDialog.Accepted
+
+    def create_progress_dialog(self, label, maximum):
+        progress = QtWidgets.QProgressDialog(label, "Cancel", 0, maximum, self)
+        progress.setWindowTitle("Save Selection Tool")
+        progress.setWindowModality(QtCore.Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.setValue(0)
+        return progress
 
     def refresh_ui(self):
         # Clear existing tabs and buttons
-        for tab_name in list(self.tabs.keys()):
-            for button in self.tabs[tab_name]:
-                button.setParent(None)
-                button.deleteLater()
-            self.tabs[tab_name].clear()
+        for tab_name in list(self.tab_pages.keys()):
+            self.release_tab_page(tab_name)
 
         # Remove all tab buttons
-        for i in reversed(range(self.tabLayout.count() - 1)):
-            widget = self.tabLayout.itemAt(i).widget()
-            if isinstance(widget, TabButton):
-                self.tabLayout.removeWidget(widget)
-                widget.deleteLater()
+        for widget in self.tab_buttons.values():
+            self.tabLayout.removeWidget(widget)
+            widget.deleteLater()
+        self.tab_buttons.clear()
 
         # Clear the tabs dictionary
         self.tabs.clear()
@@ -386,55 +1952,6 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         self.update_tab_buttons()
         self.update_selection_buttons()
 
-    def merge_selection_data(self, current_data, new_data):
-        merged_data = current_data.copy()
-
-        for tab_name, selections in new_data.items():
-            new_tab_name = tab_name
-            while new_tab_name in merged_data:
-                new_tab_name += "_new"
-            
-            if new_tab_name not in merged_data:
-                merged_data[new_tab_name] = {}
-            
-            for selection_name, selection_data in selections.items():
-                new_selection_name = selection_name
-                counter = 1
-                while self.selection_exists(merged_data, new_selection_name):
-                    if counter == 1:
-                        new_selection_name = f"{selection_name}_{counter}"
-                    else:
-                        new_selection_name = f"{selection_name}_{counter:02d}"
-                    counter += 1
-                
-                merged_data[new_tab_name][new_selection_name] = selection_data
-
-        return merged_data
-
-    def selection_exists(self, data, name):
-        return any(name in tab_data for tab_data in data.values())
-
-    def get_unique_name(self, name, existing_selections):
-        unique_name = name
-        counter = 1
-        while unique_name in existing_selections:
-            unique_name = f"{name}_{counter}"
-            counter += 1
-        return unique_name
-
-    def create_selection_button(self, selection_name, selection_data):
-        button = DraggableButton(selection_name)
-        button.clicked.connect(lambda: self.select_objects(selection_name, QtWidgets.QApplication.keyboardModifiers()))
-        button.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        button.customContextMenuRequested.connect(lambda pos, btn=button: self.show_context_menu(pos, btn))
-        
-        # Set tooltip and color
-        button.setToolTip(f"Select {selection_name} set")
-        if 'color' in selection_data:
-            self.set_button_color(button, selection_data['color'])
-        
-        return button
-
     def setup_close_button(self, layout):
         self.closeButton = QtWidgets.QPushButton('✕', self)
         self.closeButton.setStyleSheet('''
@@ -450,50 +1967,62 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         self.saveSelectionButton.clicked.connect(self.save_selection)
         self.addTabButton.clicked.connect(self.add_new_tab)
         self.closeButton.clicked.connect(self.close)
+        self.searchField.textEdited.connect(self.update_search_results)
+        self.searchField.returnPressed.connect(self.activate_top_search_result)
+        self.searchCompleter.activated[str].connect(self.activate_search_result)
         self.oldPos = self.pos()
+        # Window drags are applied at most once per display refresh
+        self.pending_pos = None
+        screen = QtGui.QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen else 60
+        self.move_timer = QTimer(self)
+        self.move_timer.setSingleShot(True)
+        self.move_timer.setInterval(max(1, int(1000 / (refresh_rate or 60))))
+        self.move_timer.timeout.connect(self.apply_pending_move)
+        # Maya selection changes are coalesced into one highlight update per interval
+        self.highlight_timer = QTimer(self)
+        self.highlight_timer.setSingleShot(True)
+        self.highlight_timer.setInterval(50)
+        self.highlight_timer.timeout.connect(self.update_highlighted_sets)
+        self.selection_callback_id = om.MEventMessage.addEventCallback("SelectionChanged", self.on_maya_selection_changed)
+        # Stored members are revalidated once the scene or the sets stop changing
+        self.validation_timer = QTimer(self)
+        self.validation_timer.setSingleShot(True)
+        self.validation_timer.setInterval(300)
+        self.validation_timer.timeout.connect(self.validate_sets)
+        self.scene_generation = SceneGeneration(on_change=self.schedule_validation)
+        self.resolver = NodePathResolver(self.scene_generation)
+        self.validator = SelectionValidator(self.scene_generation, self.resolver)
+        self.rule_evaluator = RuleSetEvaluator(self.scene_generation, self.resolver)
+        self.selection_lists = {}  # (tab name, set name) -> MSelectionList, for selection_lists_version
+        self.selection_lists_version = None
+        # A chord is applied once the chord modifier is released
+        self.chord_selection = None
+        self.chord_timer = QTimer(self)
+        self.chord_timer.setInterval(30)
+        self.chord_timer.timeout.connect(self.poll_chord_modifier)
         self.frame.mousePressEvent = self.mousePressEvent
         self.frame.mouseMoveEvent = self.mouseMoveEvent
-        self.setAcceptDrops(True)
 
     # [Event Handlers]
     def mousePressEvent(self, event):
         if event.button() == QtCore.Qt.LeftButton:
             self.oldPos = event.globalPos()
-        maya_main_window().activateWindow()
+        activate_maya_window()
 
     def mouseMoveEvent(self, event):
         if event.buttons() == QtCore.Qt.LeftButton:
             delta = QtCore.QPoint(event.globalPos() - self.oldPos)
-            self.move(self.x() + delta.x(), self.y() + delta.y())
+            self.pending_pos = (self.pos() if self.pending_pos is None else self.pending_pos) + delta
             self.oldPos = event.globalPos()
-        maya_main_window().activateWindow()
-
-    def dragEnterEvent(self, event):
-        if event.mimeData().hasText():
-            event.acceptProposedAction()
-        maya_main_window().activateWindow()
-
-    def dragMoveEvent(self, event):
-        event.acceptProposedAction()
-        maya_main_window().activateWindow()
-
-    def dropEvent(self, event):
-        source_button = event.source()
-        target_position = self.selectionButtonsLayout.indexOf(self.childAt(event.pos()))
-        if source_button and target_position != -1:
-            self.selectionButtonsLayout.removeWidget(source_button)
-            self.selectionButtonsLayout.insertWidget(target_position, source_button)
-            
-            # Update self.tabs for the current tab
-            current_tab = self.current_tab
-            self.tabs[current_tab].remove(source_button)
-            self.tabs[current_tab].insert(target_position, source_button)
-            
-            # Update the selection dictionary
-            self.update_database_order()
+            if not self.move_timer.isActive():
+                self.move_timer.start()
 
-        event.acceptProposedAction()
-        maya_main_window().activateWindow()
+    def apply_pending_move(self):
+        if self.pending_pos is not None:
+            self.move(self.pending_pos)
+            self.pending_pos = None
+        activate_maya_window()
 
     def enterEvent(self, event):
         if self.fade_away_enabled:
@@ -510,6 +2039,28 @@ class SelectSetToolWindow(QtWidgets.QWidget):
             self.fade_timer.start(10)  # 10ms delay before fade out
         super(SelectSetToolWindow, self).leaveEvent(event)
 
+    def changeEvent(self, event):
+        if event.type() == QtCore.QEvent.ApplicationFontChange:
+            self.on_style_environment_changed()
+        super(SelectSetToolWindow, self).changeEvent(event)
+
+    def closeEvent(self, event):
+        for worker in list(self.file_workers):
+            worker.requestInterruption()
+            worker.wait()
+        self.chord_timer.stop()
+        self.highlight_timer.stop()
+        self.validation_timer.stop()
+        self.scene_generation.remove_callbacks()
+        self.resolver.remove_callbacks()
+        if self.selection_callback_id is not None:
+            om.MMessage.removeCallback(self.selection_callback_id)
+            self.selection_callback_id = None
+        self.data_store.flush()
+        self.data_store.remove_callbacks()
+        self.data_store.report()
+        super(SelectSetToolWindow, self).closeEvent(event)
+
     def start_fade_animation(self):
         if self.fade_away_enabled and not self.context_menu_open:
             self.fade_animation.setDuration(400)  # 1000ms for fade out
@@ -533,41 +2084,25 @@ class SelectSetToolWindow(QtWidgets.QWidget):
             selection_dict = self.get_selection_dict()
             if first_tab_name not in selection_dict['tabs']:
                 selection_dict['tabs'][first_tab_name] = []
-            self.save_selection_dict(selection_dict)
+            self.save_selection_dict(selection_dict, [first_tab_name])
 
     def add_tab(self, tab_name, switch=False):
         selection_dict = self.get_selection_dict()
         
         # If there are no tabs, use the given tab_name (usually "1")
-        if not self.tabs:
-            pass
-        # Check if the tab name already exists
-        elif tab_name in self.tabs:
-            # If it exists, generate a unique name
-            counter = 1
-            while f"{tab_name}_{counter}" in self.tabs:
-                counter += 1
-            tab_name = f"{tab_name}_{counter}"
+        if self.tabs:
+            tab_name = self.get_unique_tab_name(tab_name)
         
-        # Create a new tab button
-        tab_button = TabButton(tab_name)
-        tab_button.tab_clicked.connect(self.switch_tab)
-        tab_button.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        tab_button.customContextMenuRequested.connect(self.on_tab_context_menu_requested)
-        tab_button.setFixedWidth(tab_button.calculate_button_width(tab_name))
-
-        # Insert the new tab button in the layout
-        self.tabLayout.insertWidget(self.tabLayout.count() - 1, tab_button)
+        self.create_tab_button(tab_name)
         
         # Initialize the tab in the tabs dictionary
         self.tabs[tab_name] = []
+        self.search_index.add_tab(tab_name)
         
-        # Add the new tab to the selection dictionary
+        # Add the new tab to the selection dictionary and save it
         if tab_name not in selection_dict:
             selection_dict[tab_name] = {}
-        
-        # Save the updated selection dictionary
-        self.save_selection_dict(selection_dict)
+            self.save_selection_dict(selection_dict, [tab_name])
         
         # Switch to the newly created tab if switch is True
         if switch:
@@ -576,6 +2111,17 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         
         return tab_name
 
+    def create_tab_button(self, tab_name):
+        tab_button = TabButton(tab_name)
+        tab_button.tab_clicked.connect(self.switch_tab)
+        tab_button.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        tab_button.customContextMenuRequested.connect(self.on_tab_context_menu_requested)
+
+        # Insert the new tab button in the layout
+        self.tabLayout.insertWidget(self.tabLayout.count() - 1, tab_button)
+        self.tab_buttons[tab_name] = tab_button
+        return tab_button
+
     def add_new_tab(self):
         dialog = CustomDialog(self, "New Tab", (180, 100))
         dialog.add_widget(QtWidgets.QLabel("Enter tab name:"))
@@ -600,28 +2146,26 @@ class SelectSetToolWindow(QtWidgets.QWidget):
             new_name = input_field.text()
             if new_name and new_name != old_name:
                 # Check if the new name already exists
-                if new_name in self.tabs:
-                    counter = 1
-                    while f"{new_name}_{counter}" in self.tabs:
-                        counter += 1
-                    new_name = f"{new_name}_{counter}"
+                new_name = self.get_unique_tab_name(new_name)
 
                 selection_dict = self.get_selection_dict()
                 selection_dict[new_name] = selection_dict.pop(old_name)
-                self.save_selection_dict(selection_dict)
+                self.save_selection_dict(selection_dict, [new_name])
 
                 # Update the tabs dictionary
                 self.tabs[new_name] = self.tabs.pop(old_name)
+                self.search_index.rename_tab(old_name, new_name, self.tabs[new_name])
+                self.membership_index.rename_tab(old_name, new_name, self.tabs[new_name])
+                if old_name in self.highlighted_sets:
+                    self.highlighted_sets[new_name] = self.highlighted_sets.pop(old_name)
+                self.tab_buttons[new_name] = self.tab_buttons.pop(old_name)
+                if old_name in self.tab_pages:
+                    self.tab_pages = OrderedDict((new_name if name == old_name else name, page) for name, page in self.tab_pages.items())
                 if self.current_tab == old_name:
                     self.current_tab = new_name
 
-                # Update button text and width
-                button.setText(new_name)
-                button.setFixedWidth(button.calculate_button_width(new_name))
-
-                # Reconnect the button's click event
-                button.clicked.disconnect()
-                button.clicked.connect(lambda: self.switch_tab(new_name))
+                # Update button text and width; tab_clicked emits the new name from now on
+                button.set_tab_name(new_name)
 
                 self.update_tab_buttons()
                 self.update_selection_buttons()
@@ -660,7 +2204,11 @@ class SelectSetToolWindow(QtWidgets.QWidget):
 
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
             selection_dict = self.get_selection_dict()
+            self.search_index.remove_tab(tab_name, self.tabs[tab_name])
             if delete_option.isChecked():
+                self.membership_index.remove_tab(tab_name, self.tabs[tab_name])
+                for selection_data in selection_dict[tab_name].values():
+                    self.delete_object_set(selection_data)
                 del selection_dict[tab_name]
                 del self.tabs[tab_name]
             else:
@@ -668,9 +2216,17 @@ class SelectSetToolWindow(QtWidgets.QWidget):
                 selection_dict[target_tab].update(selection_dict[tab_name])
                 del selection_dict[tab_name]
                 self.tabs[target_tab].extend(self.tabs[tab_name])
+                for name in self.tabs[tab_name]:
+                    self.search_index.add('set', target_tab, name)
+                    self.membership_index.move_set(name, tab_name, target_tab)
                 del self.tabs[tab_name]
+                # Rebuilt with the moved sets the next time the target tab is shown
+                self.release_tab_page(target_tab)
+            self.release_tab_page(tab_name)
+            self.schedule_highlight_update()
             
-            self.save_selection_dict(selection_dict)
+            self.save_selection_dict(selection_dict, [] if delete_option.isChecked() else [target_tab])
+            self.tab_buttons.pop(tab_name, None)
             self.tabLayout.removeWidget(button)
             button.deleteLater()
             
@@ -683,8 +2239,12 @@ class SelectSetToolWindow(QtWidgets.QWidget):
 
     def switch_tab(self, tab_name):
         if tab_name in self.tabs:
+            # Only the previously active and the newly active tab buttons change state
+            previous_button = self.tab_buttons.get(self.current_tab)
+            if previous_button is not None:
+                previous_button.set_active(False)
             self.current_tab = tab_name
-            self.update_tab_buttons()
+            self.tab_buttons[tab_name].set_active(True)
             self.update_selection_buttons()
         else:
             print(f"Error: Tab '{tab_name}' not found.")
@@ -697,60 +2257,15 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         self.show_tab_context_menu(pos, button)
 
     def update_tab_buttons(self):
-        # Remove all existing tab buttons
-        for i in reversed(range(self.tabLayout.count() - 1)):
-            widget = self.tabLayout.itemAt(i).widget()
-            if isinstance(widget, TabButton):
-                self.tabLayout.removeWidget(widget)
-                widget.deleteLater()
-
-        # Add tab buttons in the new order
-        for tab_name in self.tabs.keys():
-            tab_button = TabButton(tab_name)
-            tab_button.tab_clicked.connect(self.switch_tab)
-            tab_button.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-            tab_button.customContextMenuRequested.connect(self.on_tab_context_menu_requested)
-            self.tabLayout.insertWidget(self.tabLayout.count() - 1, tab_button)
-
-        # Update the styling
-        for i in range(self.tabLayout.count() - 1):
-            tab_button = self.tabLayout.itemAt(i).widget()
-            if tab_button.text() == self.current_tab:
-                tab_button.setStyleSheet('''
-                QPushButton {
-                    background-color: #5285a6;
-                    color: white;
-                    border-radius: 8px;
-                    padding: 0px 0px 1px 0px;
-                    font-size: 10px;
-                }
-                QPushButton:hover {
-                    background-color: #6295b6;
-                }
-                QToolTip {
-                    background-color: #5285a6;
-                    color: white;
-                    border: 0px;
-                }
-                ''')
-            else:
-                tab_button.setStyleSheet('''
-                QPushButton {
-                    background-color: #4d4d4d;
-                    color: white;
-                    border-radius: 8px;
-                    padding: 0px 0px 1px 0px;
-                    font-size: 10px;
-                }
-                QPushButton:hover {
-                    background-color: #5a5a5a;
-                }
-                QToolTip {
-                    background-color: #5285a6;
-                    color: white;
-                    border: 0px;
-                }
-                ''')
+        # Bring the persistent tab buttons in line with the tab order, only moving those out of place
+        for index, tab_name in enumerate(self.tabs.keys()):
+            tab_button = self.tab_buttons[tab_name]
+            if self.tabLayout.indexOf(tab_button) != index:
+                self.tabLayout.removeWidget(tab_button)
+                self.tabLayout.insertWidget(index, tab_button)
+
+        for tab_name, tab_button in self.tab_buttons.items():
+            tab_button.set_active(tab_name == self.current_tab)
     
     def move_tab_left(self, button):
         tab_name = button.text()
@@ -778,7 +2293,7 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         # Update the database
         selection_dict = self.get_selection_dict()
         selection_dict = {name: selection_dict[name] for name in tab_names if name in selection_dict}
-        self.save_selection_dict(selection_dict)
+        self.save_selection_dict(selection_dict, [])
         
         # Update the current_tab if it was moved
         if self.current_tab == tab_name:
@@ -828,39 +2343,48 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         elif action == move_right_action:
             self.move_tab_right(button)
 
-    def move_button_to_tab(self, button, new_tab):
-        selection_name = button.text()
+    def move_selection_to_tab(self, selection_name, new_tab):
         old_tab = self.current_tab
         
         # Update the selection_dict
         selection_dict = self.get_selection_dict()
         selection_data = selection_dict[old_tab].pop(selection_name)
         selection_dict[new_tab][selection_name] = selection_data
-        self.save_selection_dict(selection_dict)
+        self.save_selection_dict(selection_dict, [old_tab, new_tab])
         
         # Update the self.tabs dictionary
-        self.tabs[old_tab].remove(button)
-        self.tabs[new_tab].append(button)
+        self.tabs[old_tab].remove(selection_name)
+        self.tabs[new_tab].append(selection_name)
+        self.search_index.move_set(selection_name, old_tab, new_tab)
+        self.membership_index.move_set(selection_name, old_tab, new_tab)
+        self.schedule_highlight_update()
         
-        # Update the UI
-        self.selectionButtonsLayout.removeWidget(button)
-        button.setParent(None)
+        # Update the UI; a target tab without a page picks the set up when it is built
+        self.tab_pages[old_tab].remove_item(selection_name)
+        if new_tab in self.tab_pages:
+            if selection_data.get('color'):
+                self.register_button_colors([selection_data['color']])
+            self.tab_pages[new_tab].add_item(selection_name, selection_data.get('color'))
         self.update_selection_buttons()
 
     # [Select Button Functionality]        
     def calculate_button_width(self, text, padding=20):
-        font_metrics = QtGui.QFontMetrics(self.font())
-        text_width = font_metrics.horizontalAdvance(text)
-        return text_width + padding
+        return text_width(text, self.font()) + padding
     
     def add_selection_button(self, selection_name):
         selection_dict = self.get_selection_dict()
         current_tab = self.current_tab
         
         if current_tab in selection_dict and selection_name in selection_dict[current_tab]:
-            selection_data = selection_dict[current_tab][selection_name]
-            button = self.create_selection_button(selection_name, selection_data)
-            self.tabs[current_tab].append(button)
+            self.tabs[current_tab].append(selection_name)
+            self.search_index.add('set', current_tab, selection_name)
+            self.membership_index.set_members(current_tab, selection_name, self.stored_members(selection_dict[current_tab][selection_name]))
+            self.schedule_highlight_update()
+            if current_tab in self.tab_pages:
+                color = selection_dict[current_tab][selection_name].get('color')
+                if color:
+                    self.register_button_colors([color])
+                self.tab_pages[current_tab].add_item(selection_name, color)
             self.update_selection_buttons()
         else:
             print(f"Error: Selection '{selection_name}' not found in tab '{current_tab}'")
@@ -891,6 +2415,20 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         toggle_fade_action = menu.addAction("Toggle Fade Away")
         toggle_fade_action.setCheckable(True)
         toggle_fade_action.setChecked(self.fade_away_enabled)
+        toggle_strip_action = menu.addAction("Painted Set Strip")
+        toggle_strip_action.setCheckable(True)
+        toggle_strip_action.setChecked(self.strip_view_enabled)
+        missing_total = sum(sum(counts.values()) for counts in self.missing_counts.values())
+        prune_action = menu.addAction(f"Prune All Missing ({missing_total})") if missing_total else None
+        undoable_selection_action = menu.addAction("Undoable Selection")
+        undoable_selection_action.setCheckable(True)
+        undoable_selection_action.setChecked(self.selection_backend == 'cmds')
+        object_set_action = menu.addAction("Save As Object Sets")
+        object_set_action.setCheckable(True)
+        object_set_action.setChecked(self.object_set_backing)
+        soft_selection_action = menu.addAction("Capture Soft Selection")
+        soft_selection_action.setCheckable(True)
+        soft_selection_action.setChecked(self.capture_soft_selection)
         
         action = menu.exec_(self.mapToGlobal(pos))
         self.context_menu_open = False
@@ -898,6 +2436,16 @@ class SelectSetToolWindow(QtWidgets.QWidget):
             self.fade_timer.start(10)
         if action == toggle_fade_action:
             self.toggle_fade_away()
+        elif action == toggle_strip_action:
+            self.toggle_strip_view()
+        elif action is not None and action == prune_action:
+            self.prune_missing_members()
+        elif action == undoable_selection_action:
+            self.toggle_selection_backend()
+        elif action == object_set_action:
+            self.toggle_object_set_backing()
+        elif action == soft_selection_action:
+            self.toggle_soft_selection_capture()
 
     def toggle_fade_away(self):
         self.fade_away_enabled = not self.fade_away_enabled
@@ -906,7 +2454,7 @@ class SelectSetToolWindow(QtWidgets.QWidget):
             self.fade_animation.stop()
             self.setWindowOpacity(1.0)
 
-    def show_context_menu(self, pos, button):
+    def show_context_menu(self, selection_name, global_pos):
         self.context_menu_open = True
         menu = QtWidgets.QMenu()
         menu.setWindowFlags(menu.windowFlags() | QtCore.Qt.FramelessWindowHint | QtCore.Qt.NoDropShadowWindowHint)
@@ -929,6 +2477,8 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         
         rename_action = menu.addAction("Rename")
         delete_action = menu.addAction("Delete")
+        missing_count = self.missing_counts.get(self.current_tab, {}).get(selection_name, 0)
+        prune_action = menu.addAction(f"Prune Missing ({missing_count})") if missing_count else None
         
         # Add color selection submenu
         color_menu = QtWidgets.QMenu("Color")
@@ -944,7 +2494,7 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         
         for i, color in enumerate(self.color_palette):
             color_button = ColorButton(color)
-            color_button.clicked.connect(self.create_color_change_function(button, color))
+            color_button.clicked.connect(self.create_color_change_function(selection_name, color))
             color_layout.addWidget(color_button, i // 4, i % 4)
         
         color_action = QtWidgets.QWidgetAction(color_menu)
@@ -961,137 +2511,276 @@ class SelectSetToolWindow(QtWidgets.QWidget):
         for tab_name in self.tabs.keys():
             if tab_name != self.current_tab:
                 tab_action = move_menu.addAction(tab_name)
-                tab_action.triggered.connect(self.create_move_to_tab_function(button, tab_name))
+                tab_action.triggered.connect(self.create_move_to_tab_function(selection_name, tab_name))
         
-        action = menu.exec_(button.mapToGlobal(pos))
+        action = menu.exec_(global_pos)
         self.context_menu_open = False
         if self.fade_away_enabled:
             self.fade_timer.start(10)
         if action == rename_action:
-            self.rename_selection_button(button)
+            self.rename_selection_set(selection_name)
         elif action == delete_action:
-            self.delete_selection_button(button)
+            self.delete_selection_set(selection_name)
+        elif action is not None and action == prune_action:
+            self.prune_missing_members([(self.current_tab, selection_name)])
 
-    def create_color_change_function(self, button, color):
+    def create_color_change_function(self, selection_name, color):
         def change_color():
-            self.set_button_color(button, color)
-            self.update_selection_color(button.text(), color)
+            self.set_selection_color(selection_name, color)
+            self.update_selection_color(selection_name, color)
         return change_color
 
-    def create_move_to_tab_function(self, button, tab_name):
+    def create_move_to_tab_function(self, selection_name, tab_name):
         def move_to_tab():
-            self.move_button_to_tab(button, tab_name)
+            self.move_selection_to_tab(selection_name, tab_name)
         return move_to_tab
 
-    def set_button_color(self, button, color):
-        button.setStyleSheet(f'''
-            QPushButton {{
-                background-color: {color};
-                color: white;
-                border-radius: 3px;
-                padding: 2px;
-            }}
-            QPushButton:hover {{
-                background-color: {self.lighten_color(color)};
-            }}
-            QToolTip {{background-color: {color};color: white;border: 0px;}}
-        ''')
+    def set_selection_color(self, selection_name, color):
+        self.register_button_colors([color])
+        page = self.tab_pages.get(self.current_tab)
+        if page is not None:
+            page.set_item_color(selection_name, color)
+
+    def register_button_colors(self, colors):
+        # The page stack carries one stylesheet for all selection buttons; it only changes when a
+        # color is used for the first time
+        new_colors = [color for color in colors if color not in self.button_colors]
+        if not new_colors:
+            return
+        self.button_colors.update(new_colors)
+        self.selectionPages.setStyleSheet(
+            "QStackedWidget {background-color: rgba(0, 0, 0, 0);}"
+            + DraggableButton.style_sheet
+            + ''.join(color_style_rule(color) for color in sorted(self.button_colors)))
+
+    def on_style_environment_changed(self, *args):
+        invalidate_style_cache()
+        self.button_colors.clear()
+        QTimer.singleShot(0, self.refresh_ui)
 
     def update_selection_color(self, selection_name, color):
         selection_dict = self.get_selection_dict()
         current_tab = self.current_tab
         if current_tab in selection_dict and selection_name in selection_dict[current_tab]:
             selection_dict[current_tab][selection_name]['color'] = color
-            self.save_selection_dict(selection_dict)
+            self.save_selection_dict(selection_dict, [current_tab])
 
     def lighten_color(self, color, factor=1.2):
-        c = QColor(color)
-        h, s, l, a = c.getHsl()
-        l = min(int(l * factor), 255)
-        c.setHsl(h, s, l, a)
-        return c.name()
+        return lighten_color(color, factor)
 
-    def rename_selection_button(self, button):
+    def rename_selection_set(self, old_name):
         dialog = CustomDialog(self, "Rename Selection", (150, 110))
         dialog.add_widget(QtWidgets.QLabel("Enter new name:"))
-        input_field = QtWidgets.QLineEdit(button.text())
+        input_field = QtWidgets.QLineEdit(old_name)
         dialog.add_widget(input_field)
         dialog.add_button_box()
 
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
             new_name = input_field.text()
-            if new_name and new_name != button.text():
-                old_name = button.text()
+            if new_name and new_name != old_name:
                 selection_dict = self.get_selection_dict()
                 current_tab = self.current_tab
 
                 # Check if the new name already exists in the current tab
-                new_name = self.get_unique_selection_name(new_name, selection_dict[current_tab])
+                new_name = self.get_unique_selection_name(new_name, current_tab, selection_dict[current_tab])
 
                 if current_tab in selection_dict and old_name in selection_dict[current_tab]:
                     selection_dict[current_tab][new_name] = selection_dict[current_tab].pop(old_name)
-                    self.save_selection_dict(selection_dict)
+                    self.save_selection_dict(selection_dict, [current_tab])
 
-                button.setText(new_name)
-                button.setFixedWidth(button.calculate_button_width(new_name))
+                names = self.tabs[current_tab]
+                names[names.index(old_name)] = new_name
+                self.search_index.rename_set(current_tab, old_name, new_name)
+                self.membership_index.rename_set(current_tab, old_name, new_name)
+                self.schedule_highlight_update()
+                if current_tab in self.tab_pages:
+                    self.tab_pages[current_tab].rename_item(old_name, new_name)
 
-                # Update the button's click connection
-                button.clicked.disconnect()
-                button.clicked.connect(lambda: self.select_objects(new_name, QtWidgets.QApplication.keyboardModifiers()))
+    def get_unique_selection_name(self, base_name, tab_name, existing_selections):
+        return self.name_allocator.allocate(base_name, existing_selections, ('set', tab_name))
 
-    def get_unique_selection_name(self, base_name, existing_selections):
-        if base_name not in existing_selections:
-            return base_name
+    def get_unique_tab_name(self, base_name):
+        return self.name_allocator.allocate(base_name, self.tabs, 'tab')
 
-        counter = 1
-        while True:
-            if counter == 1:
-                new_name = f"{base_name}_1"
-            else:
-                new_name = f"{base_name}_{counter:02d}"
-            
-            if new_name not in existing_selections:
-                return new_name
-            
-            counter += 1
-
-    def delete_selection_button(self, button):
+    def delete_selection_set(self, selection_name):
         dialog = CustomDialog(self, "Delete Confirmation", (160, 80))
-        dialog.add_widget(QtWidgets.QLabel(f"Are you sure you want to <br> delete <b><font color='#00ade6'>{button.text()}</font></b>? "))
+        dialog.add_widget(QtWidgets.QLabel(f"Are you sure you want to <br> delete <b><font color='#00ade6'>{selection_name}</font></b>? "))
         dialog.add_button_box()
 
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
-            selection_name = button.text()
             selection_dict = self.get_selection_dict()
             current_tab = self.current_tab
 
             if current_tab in selection_dict and selection_name in selection_dict[current_tab]:
-                del selection_dict[current_tab][selection_name]
-                self.save_selection_dict(selection_dict)
+                self.delete_object_set(selection_dict[current_tab].pop(selection_name))
+                self.save_selection_dict(selection_dict, [current_tab])
 
-                # Remove the button from the current tab
-                self.tabs[current_tab].remove(button)
-                self.selectionButtonsLayout.removeWidget(button)
-                button.deleteLater()
+                # Remove the set from the current tab
+                self.tabs[current_tab].remove(selection_name)
+                self.search_index.remove('set', current_tab, selection_name)
+                self.membership_index.remove_set(current_tab, selection_name)
+                self.schedule_highlight_update()
+                if current_tab in self.tab_pages:
+                    self.tab_pages[current_tab].remove_item(selection_name)
 
     def update_selection_buttons(self):
-        if not hasattr(self, 'selectionButtonsLayout'):
-            print("Error: selectionButtonsLayout not initialized")
+        if not hasattr(self, 'selectionPages'):
+            print("Error: selectionPages not initialized")
             return
         
-        # Clear existing buttons
-        for i in reversed(range(self.selectionButtonsLayout.count())):
-            widget = self.selectionButtonsLayout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        
-        # Add new buttons for the current tab
+        # Show the page of the current tab, building it if it is not cached
         if self.current_tab in self.tabs:
-            for button in self.tabs[self.current_tab]:
-                self.selectionButtonsLayout.addWidget(button)
+            self.materialize_tab(self.current_tab)
+            self.show_tab_page(self.tab_pages[self.current_tab])
         
-        maya_main_window().activateWindow()
+        activate_maya_window()
     
+    def materialize_tab(self, tab_name):
+        # Tabs are kept as ordered name lists; their pages are only built when the tab is shown
+        if tab_name in self.tab_pages:
+            self.tab_pages.move_to_end(tab_name)
+            return self.tab_pages[tab_name]
+
+        selections = self.get_selection_dict().get(tab_name, {})
+        items = [(name, selections.get(name, {}).get('color')) for name in self.tabs[tab_name]]
+        self.register_button_colors({color for _, color in items if color})
+        if self.strip_view_enabled or len(items) > self.strip_view_threshold:
+            page = SelectionStrip(self.selectionButtonsLayout.spacing())
+        else:
+            page = SelectionButtonPage(self.selectionButtonsLayout.spacing())
+        page.setSizePolicy(QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Ignored)
+        page.set_items(items)
+        page.set_highlighted(self.highlighted_sets.get(tab_name, ()))
+        page.set_missing_counts(self.missing_counts.get(tab_name, {}))
+        page.item_clicked.connect(lambda name: self.select_objects(name, QtWidgets.QApplication.keyboardModifiers()))
+        page.item_context_menu.connect(self.show_context_menu)
+        page.item_moved.connect(self.on_selection_moved)
+
+        self.selectionPages.addWidget(page)
+        self.tab_pages[tab_name] = page
+        self.evict_tab_pages()
+        return page
+
+    def evict_tab_pages(self):
+        for tab_name in list(self.tab_pages.keys()):
+            if len(self.tab_pages) <= self.max_tab_pages:
+                break
+            if tab_name != self.current_tab:
+                self.release_tab_page(tab_name)
+
+    def set_max_tab_pages(self, count):
+        self.max_tab_pages = max(1, count)
+        self.evict_tab_pages()
+
+    def release_tab_page(self, tab_name):
+        page = self.tab_pages.pop(tab_name, None)
+        if page is not None:
+            self.selectionPages.removeWidget(page)
+            page.deleteLater()
+
+    def on_selection_moved(self, selection_name, target_position):
+        # The page has already reordered itself; keep the tab's name list and the database in step
+        names = self.tabs[self.current_tab]
+        names.remove(selection_name)
+        names.insert(target_position, selection_name)
+        self.update_database_order()
+
+    def toggle_strip_view(self):
+        self.strip_view_enabled = not self.strip_view_enabled
+        for tab_name in list(self.tab_pages.keys()):
+            self.release_tab_page(tab_name)
+        self.update_selection_buttons()
+
+    def show_tab_page(self, page):
+        # Hidden pages are ignored for sizing so the strip fits the visible tab only
+        previous = self.selectionPages.currentWidget()
+        if previous is not None and previous is not page:
+            previous.setSizePolicy(QtWidgets.QSizePolicy.Ignored, QtWidgets.QSizePolicy.Ignored)
+        page.setSizePolicy(QtWidgets.QSizePolicy.Preferred, QtWidgets.QSizePolicy.Preferred)
+        self.selectionPages.setCurrentWidget(page)
+        self.selectionPages.adjustSize()
+
+    # [Selection highlighting]
+    def on_maya_selection_changed(self, *args):
+        if not self.highlight_timer.isActive():
+            self.highlight_timer.start()
+
+    def schedule_highlight_update(self):
+        self.highlight_timer.start()
+
+    def update_highlighted_sets(self):
+        # One index lookup per selected node, however many members the sets hold
+        # Component selections are matched through their shape as well
+        selected = cmds.ls(selection=True, long=True) + cmds.ls(selection=True, long=True, objectsOnly=True)
+        self.highlighted_sets = self.membership_index.sets_containing(selected)
+        for tab_name, page in self.tab_pages.items():
+            page.set_highlighted(self.highlighted_sets.get(tab_name, ()))
+
+    # [Validation]
+    def schedule_validation(self):
+        self.validation_timer.start()
+
+    def validate_sets(self):
+        missing = self.validator.validate(self.get_selection_dict())
+        self.missing_counts = {}
+        for (tab_name, name), paths in missing.items():
+            self.missing_counts.setdefault(tab_name, {})[name] = len(paths)
+        for tab_name, page in self.tab_pages.items():
+            page.set_missing_counts(self.missing_counts.get(tab_name, {}))
+
+    def prune_missing_members(self, keys=None):
+        # Removes members whose node no longer exists from the given (tab, set) keys, or from every set
+        selection_dict = self.get_selection_dict()
+        missing = self.validator.validate(selection_dict)
+        pruned_tabs = set()
+        pruned_count = 0
+        for key, paths in missing.items():
+            if keys is not None and key not in keys:
+                continue
+            tab_name, name = key
+            dead = set(paths)
+            selection_data = selection_dict[tab_name][name]
+            uuids = selection_data.get('uuids')
+            if uuids and len(uuids) == len(selection_data['objects']):
+                selection_data['uuids'] = [uuid for path, uuid in zip(selection_data['objects'], uuids) if path not in dead]
+            selection_data['objects'] = [path for path in selection_data['objects'] if path not in dead]
+            if 'components' in selection_data:
+                selection_data['components'] = [entry for entry in selection_data['components'] if entry[0] not in dead]
+            self.membership_index.set_members(tab_name, name, self.stored_members(selection_data))
+            pruned_tabs.add(tab_name)
+            pruned_count += len(dead)
+        if pruned_tabs:
+            self.save_selection_dict(selection_dict, list(pruned_tabs))
+            self.schedule_highlight_update()
+            print(f"Pruned {pruned_count} missing members from {len(pruned_tabs)} tabs")
+
+    # [Search]
+    def update_search_results(self, text):
+        self.search_results = {}
+        for kind, tab_name, name in self.search_index.search(text):
+            display = f"{name}   [{tab_name}]" if kind == 'set' else f"[{tab_name}]"
+            self.search_results[display] = (kind, tab_name, name)
+        self.searchModel.setStringList(list(self.search_results.keys()))
+        if self.search_results:
+            self.searchCompleter.complete()
+        else:
+            self.searchCompleter.popup().hide()
+
+    def activate_search_result(self, display):
+        result = self.search_results.get(display)
+        if result is None:
+            return
+        kind, tab_name, name = result
+        self.switch_tab(tab_name)
+        if kind == 'set':
+            self.select_objects(name, QtCore.Qt.NoModifier)
+        self.searchField.clear()
+        self.search_results = {}
+
+    def activate_top_search_result(self):
+        if self.searchField.text() and self.searchModel.rowCount():
+            self.activate_search_result(self.searchModel.stringList()[0])
+
     # [Database operations]
     def save_selection(self):
         dialog = CustomDialog(self, "Save Selection", (200, 165))
@@ -1120,7 +2809,7 @@ class SelectSetToolWindow(QtWidgets.QWidget):
                 selection_dict = self.get_selection_dict()
 
                 # Ensure unique name across all tabs
-                new_name = self.get_unique_selection_name(selection_name, selection_dict[selected_tab])
+                new_name = self.get_unique_selection_name(selection_name, selected_tab, selection_dict[selected_tab])
 
                 # Update the tab dictionary
                 if selected_tab not in selection_dict:
@@ -1130,16 +2819,137 @@ class SelectSetToolWindow(QtWidgets.QWidget):
                 next_order = max([data['order'] for data in selection_dict[selected_tab].values()], default=-1) + 1
 
                 # Add the new selection
-                selection_dict[selected_tab][new_name] = {
-                    'order': next_order,
-                    'objects': current_selection,
-                    'color': self.color_palette[0]  # Default color
-                }
-
-                self.save_selection_dict(selection_dict)
+                if self.object_set_backing:
+                    # Maya tracks the members; the data only keeps the UI settings and the set node
+                    set_node = cmds.sets(current_selection, name=object_set_name(new_name))
+                    selection_dict[selected_tab][new_name] = {
+                        'order': next_order,
+                        'set_node': set_node,
+                        'set_uuid': self.resolver.uuids_of([set_node])[0],
+                        'color': self.color_palette[0]  # Default color
+                    }
+                else:
+                    # Mesh and curve components are stored per shape as index runs, not one string per range
+                    objects, components = capture_selection(om.MGlobal.getActiveSelectionList())
+                    component_uuids = self.resolver.uuids_of([node for node, _ in components])
+                    selection_dict[selected_tab][new_name] = {
+                        'order': next_order,
+                        'objects': objects,
+                        'uuids': self.resolver.uuids_of(objects),
+                        'components': [[node, uuid, component_type, ranges] for ((node, component_type), ranges), uuid in zip(components.items(), component_uuids)],
+                        'color': self.color_palette[0]  # Default color
+                    }
+                    if self.capture_soft_selection and cmds.softSelect(query=True, softSelectEnabled=True):
+                        # Falloff weights are packed float arrays, not JSON number lists
+                        weights = capture_weights(om.MGlobal.getRichSelection())
+                        weight_uuids = self.resolver.uuids_of([entry[0] for entry in weights])
+                        selection_dict[selected_tab][new_name]['weights'] = [[entry[0], uuid] + entry[1:] for entry, uuid in zip(weights, weight_uuids)]
+
+                self.save_selection_dict(selection_dict, [selected_tab])
                 self.switch_tab(selected_tab)
                 self.add_selection_button(new_name)
 
+    def save_hierarchy_set(self):
+        roots = cmds.ls(selection=True, long=True, objectsOnly=True)
+        if not roots:
+            cmds.warning("Select the root objects of the hierarchy set.")
+            return
+
+        dialog = CustomDialog(self, "Save Hierarchy Set", (220, 280))
+        dialog.add_widget(QtWidgets.QLabel("Enter selection name:"))
+        input_field = QtWidgets.QLineEdit()
+        dialog.add_widget(input_field)
+        dialog.add_widget(QtWidgets.QLabel("Select tab:"))
+        tab_combo = QtWidgets.QComboBox()
+        view = tab_combo.view()
+        view.setSpacing(4)
+        tab_combo.setFixedHeight(28)
+        tab_combo.addItems(self.tabs.keys())
+        tab_combo.setCurrentText(self.current_tab)
+        dialog.add_widget(tab_combo)
+        descendants_check = QtWidgets.QCheckBox("Include descendants")
+        descendants_check.setChecked(True)
+        dialog.add_widget(descendants_check)
+        dialog.add_widget(QtWidgets.QLabel("Node type:"))
+        node_type_field = QtWidgets.QLineEdit("transform")
+        node_type_field.setPlaceholderText("any type")
+        dialog.add_widget(node_type_field)
+        dialog.add_widget(QtWidgets.QLabel("Name pattern:"))
+        pattern_field = QtWidgets.QLineEdit()
+        pattern_field.setPlaceholderText("e.g. *_ctrl")
+        dialog.add_widget(pattern_field)
+        dialog.add_button_box()
+
+        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            selection_name = input_field.text()
+            if selection_name:
+                # Only the roots and the rules are stored; members are found again whenever the scene changes
+                rule = {
+                    'type': 'hierarchy',
+                    'roots': roots,
+                    'root_uuids': self.resolver.uuids_of(roots),
+                    'descendants': descendants_check.isChecked(),
+                    'node_type': node_type_field.text().strip(),
+                    'pattern': pattern_field.text().strip(),
+                }
+                self.add_rule_set(selection_name, tab_combo.currentText(), rule)
+
+    def save_query_set(self):
+        dialog = CustomDialog(self, "Save Query Set", (220, 330))
+        dialog.add_widget(QtWidgets.QLabel("Enter selection name:"))
+        input_field = QtWidgets.QLineEdit()
+        dialog.add_widget(input_field)
+        dialog.add_widget(QtWidgets.QLabel("Select tab:"))
+        tab_combo = QtWidgets.QComboBox()
+        view = tab_combo.view()
+        view.setSpacing(4)
+        tab_combo.setFixedHeight(28)
+        tab_combo.addItems(self.tabs.keys())
+        tab_combo.setCurrentText(self.current_tab)
+        dialog.add_widget(tab_combo)
+        dialog.add_widget(QtWidgets.QLabel("Name pattern:"))
+        pattern_field = QtWidgets.QLineEdit("*:*_ctrl")
+        dialog.add_widget(pattern_field)
+        match_combo = QtWidgets.QComboBox()
+        match_combo.setFixedHeight(28)
+        match_combo.addItems(["Wildcard", "Regular Expression"])
+        dialog.add_widget(match_combo)
+        dialog.add_widget(QtWidgets.QLabel("Node type:"))
+        node_type_field = QtWidgets.QLineEdit("transform")
+        node_type_field.setPlaceholderText("any type")
+        dialog.add_widget(node_type_field)
+        dialog.add_widget(QtWidgets.QLabel("Shape type:"))
+        shape_type_field = QtWidgets.QLineEdit("nurbsCurve")
+        shape_type_field.setPlaceholderText("any shape")
+        dialog.add_widget(shape_type_field)
+        dialog.add_button_box()
+
+        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+            selection_name = input_field.text()
+            if selection_name:
+                # The query is stored and evaluated again whenever the scene changes
+                rule = {
+                    'type': 'query',
+                    'pattern': pattern_field.text().strip(),
+                    'match': 'regex' if match_combo.currentIndex() == 1 else 'wildcard',
+                    'node_type': node_type_field.text().strip(),
+                    'shape_type': shape_type_field.text().strip(),
+                }
+                self.add_rule_set(selection_name, tab_combo.currentText(), rule)
+
+    def add_rule_set(self, selection_name, selected_tab, rule):
+        selection_dict = self.get_selection_dict()
+        new_name = self.get_unique_selection_name(selection_name, selected_tab, selection_dict[selected_tab])
+        next_order = max([data['order'] for data in selection_dict[selected_tab].values()], default=-1) + 1
+        selection_dict[selected_tab][new_name] = {
+            'order': next_order,
+            'rule': rule,
+            'color': self.color_palette[0]  # Default color
+        }
+        self.save_selection_dict(selection_dict, [selected_tab])
+        self.switch_tab(selected_tab)
+        self.add_selection_button(new_name)
+
     def delete_selection(self, selection_name):
         selection_dict = self.get_selection_dict()
         if selection_name in selection_dict:
@@ -1166,83 +2976,306 @@ class SelectSetToolWindow(QtWidgets.QWidget):
             cmds.warning(f"Selection '{old_name}' not found.")
 
     def select_objects(self, selection_name, modifiers):
-        selection_dict = self.get_selection_dict()
-        current_tab = self.current_tab
+        operation = selection_operation(modifiers)
+        selection_data = self.get_selection_dict().get(self.current_tab, {}).get(selection_name, {})
+        if 'set_node' in selection_data and operation in self.object_set_select_flags and not modifiers & self.chord_modifier:
+            # Selecting an objectSet selects its members in one native call
+            set_node = self.set_node_of(selection_data)
+            if set_node:
+                cmds.select(set_node, **{self.object_set_select_flags[operation]: True})
+                self.membership_index.set_members(self.current_tab, selection_name, self.stored_members(selection_data))
+            else:
+                cmds.warning(f"Object set of '{selection_name}' no longer exists.")
+            activate_maya_window()
+            return
 
-        if current_tab in selection_dict and selection_name in selection_dict[current_tab]:
-            objects = selection_dict[current_tab][selection_name]['objects']
+        if selection_data.get('weights') and operation == 'replace' and not modifiers & self.chord_modifier:
+            # Weighted sets restore their falloff with one rich selection call
+            om.MGlobal.setRichSelection(weighted_selection(self.resolve_weights(selection_data['weights'])))
+            activate_maya_window()
+            return
 
-            if isinstance(objects, list):
-                if modifiers == QtCore.Qt.ShiftModifier:
-                    cmds.select(objects, add=True)
-                else:
-                    cmds.select(objects, replace=True)
+        if self.selection_backend == 'api' and operation in self.api_list_adjustments and not modifiers & self.chord_modifier:
+            selection_list = self.get_set_selection_list(self.current_tab, selection_name)
+            if selection_list is not None:
+                om.MGlobal.setActiveSelectionList(selection_list, self.api_list_adjustments[operation])
+            activate_maya_window()
+            return
+
+        members = self.get_set_members(self.current_tab, selection_name)
+        if members is not None:
+            target = (members, self.get_set_components(self.current_tab, selection_name))
+            if modifiers & self.chord_modifier:
+                self.add_to_chord(operation, target)
             else:
-                cmds.warning(f"Invalid data for selection '{selection_name}'.")
-        else:
+                self.apply_selection(self.combine_with_selection(operation, target))
+
+        activate_maya_window()
+
+    def get_set_members(self, tab_name, selection_name):
+        selection_dict = self.get_selection_dict()
+        if tab_name not in selection_dict or selection_name not in selection_dict[tab_name]:
             cmds.warning(f"Selection '{selection_name}' not found.")
+            return None
+        selection_data = selection_dict[tab_name][selection_name]
+        if 'rule' in selection_data:
+            # Rule sets are expanded on use and only indexed for highlighting once expanded
+            members = self.rule_evaluator.evaluate(selection_data['rule'])
+            self.membership_index.set_members(tab_name, selection_name, members)
+            return members
+        if 'set_node' in selection_data:
+            if not self.set_node_of(selection_data):
+                cmds.warning(f"Object set of '{selection_name}' no longer exists.")
+                return None
+            members = self.stored_members(selection_data)
+            self.membership_index.set_members(tab_name, selection_name, members)
+            return members
+        objects = selection_data['objects']
+        if not isinstance(objects, list):
+            cmds.warning(f"Invalid data for selection '{selection_name}'.")
+            return None
+
+        objects = self.refresh_set_paths(tab_name, selection_name, selection_data)
+
+        # Members deleted from the scene are skipped instead of failing the whole selection
+        if self.validator.is_current(tab_name):
+            missing = set(self.validator.missing.get((tab_name, selection_name), ()))
+        else:
+            missing = self.validator.missing_paths(objects)
+        if missing:
+            cmds.warning(f"{len(missing)} missing members of '{selection_name}' were skipped.")
+            objects = [path for path in objects if path not in missing]
+        return objects
+
+    def refresh_set_paths(self, tab_name, selection_name, selection_data):
+        # Stored paths follow renamed and reparented nodes through their UUIDs. Only the set being
+        # used is resolved. Sets saved before UUIDs were stored gain them the first time they are
+        # used. The updates are made in memory only and are written with the tab's next edit, so
+        # using a set never marks the scene as modified.
+        objects = selection_data['objects']
+        uuids = selection_data.get('uuids')
+        changed = False
+        if uuids is None or len(uuids) != len(objects):
+            selection_data['uuids'] = self.resolver.uuids_of(objects)
+            changed = True
+        else:
+            resolved = self.resolver.resolve(objects, uuids)
+            if resolved != objects:
+                selection_data['objects'] = objects = resolved
+                changed = True
+        for entry in selection_data.get('components', ()):
+            node_path = self.resolver.path_of(entry[1]) if entry[1] else None
+            if node_path and node_path != entry[0]:
+                entry[0] = node_path
+                changed = True
+        if changed:
+            self.membership_index.set_members(tab_name, selection_name, self.stored_members(selection_data))
+            self.schedule_highlight_update()
+        return objects
+
+    def get_set_components(self, tab_name, selection_name):
+        # Stored component runs keyed by the current path of their shape; shapes no longer in the scene are skipped
+        selection_data = self.get_selection_dict().get(tab_name, {}).get(selection_name, {})
+        components = {}
+        for node, uuid, component_type, ranges in selection_data.get('components', ()):
+            node = (self.resolver.path_of(uuid) if uuid else None) or node
+            components[(node, component_type)] = ranges
+        missing = self.validator.missing_paths([node for node, _ in components]) if components else ()
+        if missing:
+            cmds.warning(f"Components of {len(missing)} missing shapes in '{selection_name}' were skipped.")
+            components = {key: ranges for key, ranges in components.items() if key[0] not in missing}
+        return components
+
+    def resolve_weights(self, weights):
+        return [[(self.resolver.path_of(uuid) if uuid else None) or node, component_type, packed_elements, packed_weights]
+                for node, uuid, component_type, packed_elements, packed_weights in weights]
+
+    def toggle_soft_selection_capture(self):
+        self.capture_soft_selection = not self.capture_soft_selection
+
+    def set_node_of(self, selection_data):
+        # The backing objectSet, found by UUID so renaming the node does not break the set. The
+        # name is confirmed before use, so a node renamed or deleted in the Outliner is never
+        # returned under a stale name.
+        set_node = self.resolver.path_of(selection_data['set_uuid']) if selection_data.get('set_uuid') else None
+        if set_node is not None and not cmds.objExists(set_node):
+            set_node = None
+        if set_node is None and cmds.objExists(selection_data['set_node']):
+            set_node = selection_data['set_node']
+        return set_node
+
+    def stored_members(self, selection_data):
+        # Stored paths or the current members of the backing objectSet. Rule sets have none until
+        # they are expanded by get_set_members.
+        if 'rule' in selection_data:
+            return []
+        if 'set_node' in selection_data:
+            set_node = self.set_node_of(selection_data)
+            members = cmds.sets(set_node, query=True) if set_node else None
+            return cmds.ls(members, long=True) if members else []
+        objects = selection_data.get('objects')
+        objects = objects if isinstance(objects, list) else []
+        return objects + [entry[0] for entry in selection_data.get('components', ())]
+
+    def indexed_members(self, selection_data):
+        # Members indexed for highlighting when the tool is built. Maya keeps the members of
+        # objectSet-backed sets, which are queried and indexed when the set is used, like rule sets.
+        return [] if 'set_node' in selection_data else self.stored_members(selection_data)
+
+    def delete_object_set(self, selection_data):
+        set_node = self.set_node_of(selection_data) if 'set_node' in selection_data else None
+        if set_node:
+            cmds.delete(set_node)
+
+    def delete_replaced_object_sets(self, replaced, new_data):
+        # Replaced sets take their objectSet with them, unless a loaded set is backed by the same node
+        kept = {self.set_node_of(data) for selections in new_data.values() for data in selections.values() if 'set_node' in data}
+        for selection_data in replaced:
+            set_node = self.set_node_of(selection_data) if 'set_node' in selection_data else None
+            if set_node and set_node not in kept:
+                cmds.delete(set_node)
+                kept.add(set_node)
+
+    def toggle_object_set_backing(self):
+        self.object_set_backing = not self.object_set_backing
+
+    def get_set_selection_list(self, tab_name, selection_name):
+        # Member strings are parsed into an MSelectionList once and reused until the scene or the sets change
+        version = (self.scene_generation.value, self.data_store.version)
+        if self.selection_lists_version != version:
+            self.selection_lists.clear()
+            self.selection_lists_version = version
+        key = (tab_name, selection_name)
+        if key not in self.selection_lists:
+            members = self.get_set_members(tab_name, selection_name)
+            if members is None:
+                return None
+            selection_list = add_paths(om.MSelectionList(), members)
+            self.selection_lists[key] = add_components(selection_list, self.get_set_components(tab_name, selection_name))
+        return self.selection_lists[key]
+
+    def benchmark_selection(self, selection_name, repeat=20):
+        # Compares cmds.select on the stored path strings with applying the cached MSelectionList
+        members = self.get_set_members(self.current_tab, selection_name)
+        if not members:
+            return
+        start = time.perf_counter()
+        for _ in range(repeat):
+            cmds.select(members, replace=True)
+        cmds_time = (time.perf_counter() - start) / repeat
+        self.selection_lists_version = None
+        start = time.perf_counter()
+        selection_list = self.get_set_selection_list(self.current_tab, selection_name)
+        build_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(repeat):
+            om.MGlobal.setActiveSelectionList(selection_list, om.MGlobal.kReplaceList)
+        api_time = (time.perf_counter() - start) / repeat
+        print(f"'{selection_name}' ({len(members)} members): cmds.select {cmds_time * 1000:.2f} ms, "
+              f"cached MSelectionList {api_time * 1000:.2f} ms (built once in {build_time * 1000:.2f} ms)")
+
+    def toggle_selection_backend(self):
+        self.selection_backend = 'cmds' if self.selection_backend == 'api' else 'api'
+
+    def combine_with_selection(self, operation, target, current=None):
+        # Selections are (paths, components). Paths combine as string sets, with other component
+        # ranges flattened; single indexed components combine as index runs per shape.
+        members, components = target
+        if operation == 'replace':
+            return list(members), dict(components)
+        if has_components(members):
+            # Component strings of legacy, objectSet-backed and rule sets are brought into the same
+            # form as the captured selection, so runs are combined with runs
+            members, components = capture_selection(add_components(add_paths(om.MSelectionList(), members), components))
+        if current is None:
+            current = capture_selection(om.MGlobal.getActiveSelectionList())
+        current_paths, current_components = current
+        if has_components(members) or has_components(current_paths):
+            current_paths, members = flatten_paths(current_paths), flatten_paths(members)
+        return combine_selection(operation, current_paths, members), combine_components(operation, current_components, components)
+
+    def add_to_chord(self, operation, target):
+        if self.chord_selection is None:
+            self.chord_selection = self.combine_with_selection(operation, target)
+            self.chord_timer.start()
+        else:
+            if operation == 'replace':
+                operation = 'union'
+            self.chord_selection = self.combine_with_selection(operation, target, self.chord_selection)
+
+    def poll_chord_modifier(self):
+        if QtWidgets.QApplication.queryKeyboardModifiers() & self.chord_modifier:
+            return
+        self.chord_timer.stop()
+        chord_selection, self.chord_selection = self.chord_selection, None
+        if chord_selection is not None:
+            self.apply_selection(chord_selection)
+
+    def apply_selection(self, selection):
+        # A single selection call, so every combination is one undo step. The MSelectionList is only
+        # applied directly when undoable selection was turned off.
+        paths, components = selection
+        if self.selection_backend == 'api':
+            selection_list = add_components(add_paths(om.MSelectionList(), paths), components)
+            om.MGlobal.setActiveSelectionList(selection_list, om.MGlobal.kReplaceList)
+            return
+        paths = paths + component_paths(components)
+        if paths:
+            cmds.select(paths, replace=True)
+        else:
+            cmds.select(clear=True)
 
-        maya_main_window().activateWindow()
-    
     def get_selection_dict(self):
-        if not cmds.objExists('defaultObjectSet'):
-            cmds.createNode('objectSet', name='defaultObjectSet')
-        if not cmds.attributeQuery('selectToolData', node='defaultObjectSet', exists=True):
-            cmds.addAttr('defaultObjectSet', longName='selectToolData', dataType='string')
-            return {"1": {}}  # Initialize with a default tab
+        return self.data_store.get()
 
-        data = cmds.getAttr('defaultObjectSet.selectToolData')
-        if data:
-            try:
-                return json.loads(data)
-            except json.JSONDecodeError:
-                cmds.warning("Invalid data in selectToolData. Resetting.")
-                return {"1": {}}
-        return {"1": {}}
+    def save_selection_dict(self, selection_dict, tabs=None):
+        self.data_store.save(selection_dict, tabs)
+        self.validator.invalidate(tabs)
+        self.schedule_validation()
 
-    def save_selection_dict(self, selection_dict):
-        cmds.setAttr('defaultObjectSet.selectToolData', json.dumps(selection_dict), type='string')
+    def on_selection_data_changed_externally(self):
+        # Rebuild outside of the Maya callback, once the triggering command has finished
+        self.name_allocator.clear()
+        self.validator.invalidate()
+        QTimer.singleShot(0, self.refresh_ui)
 
     def update_database_order(self):
         selection_dict = self.get_selection_dict()
         current_tab = self.current_tab
 
         if current_tab in selection_dict:
-            for i, button in enumerate(self.tabs[current_tab]):
-                selection_name = button.text()
+            for i, selection_name in enumerate(self.tabs[current_tab]):
                 if selection_name in selection_dict[current_tab]:
                     selection_dict[current_tab][selection_name]['order'] = i
 
-        self.save_selection_dict(selection_dict)
+        self.save_selection_dict(selection_dict, [current_tab])
     
     def populate_existing_selections(self):
         selection_dict = self.get_selection_dict()
         
         # Clear existing tabs and buttons
         self.tabs.clear()
-        for i in reversed(range(self.selectionButtonsLayout.count())):
-            widget = self.selectionButtonsLayout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-                widget.deleteLater()
+        for tab_name in list(self.tab_pages.keys()):
+            self.release_tab_page(tab_name)
         
         # Remove all existing tab buttons
-        for i in reversed(range(self.tabLayout.count() - 1)):
-            widget = self.tabLayout.itemAt(i).widget()
-            if isinstance(widget, TabButton):
-                self.tabLayout.removeWidget(widget)
-                widget.deleteLater()
+        for widget in self.tab_buttons.values():
+            self.tabLayout.removeWidget(widget)
+            widget.deleteLater()
+        self.tab_buttons.clear()
         
-        # Iterate through each tab and add buttons
+        # Build every tab from the single read above. Nothing is written back.
         for tab_name, selections in selection_dict.items():
-            self.add_tab(tab_name, switch=False)
+            self.create_tab_button(tab_name)
             
-            # Sort selections by order
+            # Sort selections by order; buttons are created when the tab is first shown
             sorted_selections = sorted(selections.items(), key=lambda x: x[1]['order'])
-            
-            for selection_name, selection_data in sorted_selections:
-                button = self.create_selection_button(selection_name, selection_data)
-                self.tabs[tab_name].append(button)
+            self.tabs[tab_name] = [selection_name for selection_name, _ in sorted_selections]
+        self.search_index.rebuild(self.tabs)
+        self.membership_index.rebuild(selection_dict, self.indexed_members)
+        self.highlighted_sets = {}
+        self.schedule_highlight_update()
+        self.schedule_validation()
         
         # Switch to the first tab after populating
         if self.tabs: